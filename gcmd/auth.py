@@ -2,8 +2,12 @@
 Authentication module for Google Drive OAuth flow.
 """
 
+import functools
+import logging
 import os
 import json
+import tempfile
+import threading
 from pathlib import Path
 from typing import Optional
 
@@ -11,6 +15,10 @@ from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 
+from .utils import json_loads
+
+logger = logging.getLogger(__name__)
+
 # Scopes required for Drive and Tasks operations
 SCOPES = [
     "https://www.googleapis.com/auth/drive.readonly",
@@ -19,9 +27,13 @@ SCOPES = [
     "https://www.googleapis.com/auth/tasks.readonly",
 ]
 
+# Serializes writes to the token file, which may come from several threads
+_save_lock = threading.Lock()
+
 
+@functools.lru_cache(maxsize=1)
 def get_config_dir() -> Path:
-    """Get the configuration directory for gcmd."""
+    """Get the configuration directory for gcmd, creating it on first use."""
     config_home = os.environ.get("XDG_CONFIG_HOME", str(Path.home() / ".config"))
     config_dir = Path(config_home) / "gcmd"
     config_dir.mkdir(parents=True, exist_ok=True)
@@ -41,8 +53,38 @@ def get_credentials_path() -> Path:
 def save_credentials(creds: Credentials) -> None:
     """Save credentials to token file."""
     token_path = get_token_path()
-    with open(token_path, "w") as token_file:
-        token_file.write(creds.to_json())
+    # Write to a temporary file and rename it into place, so an interrupted
+    # write never leaves a truncated token file behind. mkstemp gives each
+    # writer its own file, readable only by the user, so separate gcmd
+    # processes refreshing at once can't clobber each other's writes.
+    with _save_lock:
+        fd, tmp_name = tempfile.mkstemp(
+            dir=token_path.parent, prefix=f".{token_path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                os.fchmod(f.fileno(), 0o600)
+                f.write(creds.to_json().encode("utf-8"))
+            os.replace(tmp_name, token_path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+
+class _PersistedCredentials(Credentials):
+    """
+    Credentials that write themselves back to the token file on every refresh.
+
+    The transport refreshes credentials on its own once they stop being
+    valid, so refreshes can happen anywhere in a run, not just here.
+    """
+
+    def refresh(self, request) -> None:
+        super().refresh(request)
+        try:
+            save_credentials(self)
+        except OSError as e:
+            logger.warning("Warning: Failed to save refreshed token: %s", e)
 
 
 def load_credentials() -> Optional[Credentials]:
@@ -51,13 +93,18 @@ def load_credentials() -> Optional[Credentials]:
     if not token_path.exists():
         return None
     
-    creds = Credentials.from_authorized_user_file(str(token_path), SCOPES)
+    token_info = json_loads(token_path.read_bytes())
+    creds = _PersistedCredentials.from_authorized_user_info(token_info, SCOPES)
     return creds
 
 
+@functools.lru_cache(maxsize=1)
 def get_authenticated_credentials() -> Credentials:
     """
     Get authenticated credentials, refreshing or initiating OAuth flow as needed.
+
+    The result is cached for the lifetime of the process, so the token file
+    is only read once per invocation.
     
     Returns:
         Credentials: Valid Google OAuth credentials
@@ -68,15 +115,17 @@ def get_authenticated_credentials() -> Credentials:
     """
     creds = load_credentials()
     
-    # If we have valid credentials, return them
+    # If we have valid credentials, return them. Credentials.valid reports
+    # False a few minutes before expiry, which is also when the transport would
+    # refresh the token anyway, so refreshing here instead loses nothing.
     if creds and creds.valid:
         return creds
     
     # If credentials exist but are expired, refresh them
     if creds and creds.expired and creds.refresh_token:
         try:
+            # Refreshing saves the new token to the token file
             creds.refresh(Request())
-            save_credentials(creds)
             return creds
         except Exception as e:
             print(f"Failed to refresh token: {e}")
@@ -156,9 +205,10 @@ def get_authenticated_credentials() -> Credentials:
 def revoke_credentials() -> None:
     """Revoke and delete stored credentials."""
     token_path = get_token_path()
-    if token_path.exists():
+    try:
         token_path.unlink()
-        print(f"Removed credentials from {token_path}")
-    else:
+    except FileNotFoundError:
         print("No credentials found to revoke")
+    else:
+        print(f"Removed credentials from {token_path}")
 
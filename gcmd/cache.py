@@ -0,0 +1,235 @@
+"""
+Persistent on-disk cache for file metadata and listings.
+
+Entries live in a SQLite database under the user's cache directory and are
+reused across gcmd invocations until they are older than the TTL
+(GCMD_CACHE_TTL seconds, default 60; 0 disables the cache).
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from .utils import json_dumps, json_loads
+
+# Seconds a cached entry stays valid unless GCMD_CACHE_TTL says otherwise
+DEFAULT_TTL = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    file_id TEXT NOT NULL,
+    fields_hash TEXT NOT NULL,
+    data BLOB NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (file_id, fields_hash)
+);
+CREATE TABLE IF NOT EXISTS listings (
+    query_hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+_connection: Optional[sqlite3.Connection] = None
+_connection_failed = False
+_lock = threading.Lock()
+
+
+def get_cache_dir() -> Path:
+    """Get the cache directory for gcmd (not created here)."""
+    cache_home = os.environ.get("XDG_CACHE_HOME", str(Path.home() / ".cache"))
+    return Path(cache_home) / "gcmd"
+
+
+def get_cache_path() -> Path:
+    """Get the path to the metadata cache database."""
+    return get_cache_dir() / "meta.sqlite"
+
+
+def get_ttl() -> float:
+    """Get the cache TTL in seconds from GCMD_CACHE_TTL, falling back to the default."""
+    try:
+        return max(0.0, float(os.environ.get("GCMD_CACHE_TTL", DEFAULT_TTL)))
+    except ValueError:
+        return DEFAULT_TTL
+
+
+def _hash(*parts: Any) -> str:
+    """Fingerprint a request's parameters."""
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _connect() -> Optional[sqlite3.Connection]:
+    """
+    Open the cache database on first use.
+
+    Must be called with _lock held. Returns None if the cache is disabled or
+    can't be opened (e.g. a read-only home directory), in which case gcmd
+    simply runs uncached.
+    """
+    global _connection, _connection_failed
+    if _connection is not None or _connection_failed:
+        return _connection
+    if get_ttl() <= 0:
+        _connection_failed = True
+        return None
+    try:
+        path = get_cache_path()
+        # The cache holds file names, owners and permissions, so keep it
+        # private to the user
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        os.chmod(path.parent, 0o700)
+        os.close(os.open(str(path), os.O_WRONLY | os.O_CREAT, 0o600))
+        connection = sqlite3.connect(str(path), timeout=5, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        # SQLite gives the WAL and shared-memory files the database's mode,
+        # but tighten files left by older versions too
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.chmod(f"{path}{suffix}", 0o600)
+            except FileNotFoundError:
+                pass
+        _connection = connection
+    except (OSError, sqlite3.Error):
+        _connection_failed = True
+    return _connection
+
+
+def _get(sql: str, params: tuple) -> Optional[Any]:
+    """Run a lookup and decode its JSON blob, or return None on a miss."""
+    with _lock:
+        connection = _connect()
+        if connection is None:
+            return None
+        try:
+            row = connection.execute(sql, params + (time.time() - get_ttl(),)).fetchone()
+        except sqlite3.Error:
+            return None
+    return json_loads(row[0]) if row else None
+
+
+def _put(sql: str, params: tuple) -> None:
+    """Run a write, ignoring errors: the cache is only an optimization."""
+    with _lock:
+        connection = _connect()
+        if connection is None:
+            return
+        try:
+            with connection:
+                connection.execute(sql, params)
+        except sqlite3.Error:
+            pass
+
+
+def get_metadata(file_id: str, fields: str) -> Optional[dict]:
+    """
+    Get cached metadata for a file.
+
+    Args:
+        file_id: Google Drive file ID
+        fields: The fields mask the metadata was requested with
+
+    Returns:
+        The metadata, or None if it isn't cached or has expired
+    """
+    return _get(
+        "SELECT data FROM metadata WHERE file_id = ? AND fields_hash = ? AND fetched_at > ?",
+        (file_id, _hash(fields)),
+    )
+
+
+def put_metadata(file_id: str, fields: str, metadata: dict) -> None:
+    """
+    Cache metadata for a file.
+
+    Args:
+        file_id: Google Drive file ID
+        fields: The fields mask the metadata was requested with
+        metadata: The metadata returned by the API
+    """
+    _put(
+        "INSERT OR REPLACE INTO metadata (file_id, fields_hash, data, fetched_at) VALUES (?, ?, ?, ?)",
+        (file_id, _hash(fields), json_dumps(metadata), time.time()),
+    )
+
+
+def get_listing(*params: Any) -> Optional[list]:
+    """
+    Get a cached file listing.
+
+    Args:
+        *params: Everything that determines the listing's result (query,
+            ordering, number of results, fields, ...)
+
+    Returns:
+        The list of files, or None if it isn't cached or has expired
+    """
+    return _get(
+        "SELECT data FROM listings WHERE query_hash = ? AND fetched_at > ?",
+        (_hash(*params),),
+    )
+
+
+def put_listing(files: list, *params: Any) -> None:
+    """
+    Cache a file listing.
+
+    Args:
+        files: The list of files
+        *params: The parameters the listing was made with, as for get_listing
+    """
+    _put(
+        "INSERT OR REPLACE INTO listings (query_hash, data, fetched_at) VALUES (?, ?, ?)",
+        (_hash(*params), json_dumps(files), time.time()),
+    )
+
+
+def invalidate(file_id: str) -> None:
+    """
+    Drop everything cached about a file after it has been changed.
+
+    Listings can't be matched to the files in them, so they are all dropped.
+
+    Args:
+        file_id: Google Drive file ID
+    """
+    with _lock:
+        connection = _connect()
+        if connection is None:
+            return
+        try:
+            with connection:
+                connection.execute("DELETE FROM metadata WHERE file_id = ?", (file_id,))
+                connection.execute("DELETE FROM listings")
+        except sqlite3.Error:
+            pass
+
+
+def clear() -> bool:
+    """
+    Delete the cache database.
+
+    Returns:
+        True if there was a cache to delete
+    """
+    global _connection, _connection_failed
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
+        _connection_failed = False
+        removed = False
+        path = get_cache_path()
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                Path(f"{path}{suffix}").unlink()
+                removed = True
+            except FileNotFoundError:
+                pass
+        return removed
@@ -1,33 +1,20 @@
 import argparse
+import importlib
+import logging
 import sys
-from . import __version__
-from .download import export_google_doc_as_markdown, download_file, get_file_metadata
-from .list import list_files, search_files, list_google_docs, format_file_list
-from .utils import extract_file_id
-from .docs import list_document_tabs, get_document_structure, format_tabs_output, format_headings_output, export_all_tabs
-from .comments import list_comments, format_comments_output
-from .tasks import list_tasks, list_task_lists, format_task_list, format_task_lists
-from .sheets import export_spreadsheet_as_csv, list_sheets, format_sheets_output
-
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Optional
 
-def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(
-        prog="gcmd",
-        description="Command-line utilities for Google services (Drive, Docs, Sheets, and more)",
-    )
+from . import __version__
+from .utils import extract_file_id, format_file_size
 
-    parser.add_argument(
-        "-V",
-        "--version",
-        action="version",
-        version=f"gcmd {__version__}",
-        help="Show the gcmd version and exit",
-    )
+# Section divider used in command output
+_DIV = "=" * 70
 
-    subparsers = parser.add_subparsers(dest="command", metavar="<command>")
-    subparsers.required = False
 
-    # Export subcommand - export Google Docs as markdown or Sheets as CSV
+def _add_export_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the 'export' subcommand."""
     export_parser = subparsers.add_parser(
         "export",
         help="Export a Google Doc as markdown or Sheet as CSV",
@@ -48,27 +35,42 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Export all tabs as separate markdown files (Google Docs only)",
     )
-    export_parser.set_defaults(func=cmd_export)
 
-    # Download subcommand - download any file
+
+def _add_download_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the 'download' subcommand."""
     download_parser = subparsers.add_parser(
         "download",
-        help="Download a file from Google Drive",
-        description="Download a file from Google Drive (for non-Google Doc files)",
+        help="Download files from Google Drive",
+        description="Download one or more files from Google Drive (for non-Google Doc files)",
     )
     download_parser.add_argument(
         "file_id_or_url",
         metavar="file_id_or_url",
-        help="Google Drive file ID or full URL",
+        nargs="+",
+        help="Google Drive file ID or full URL (several files are downloaded in parallel)",
     )
     download_parser.add_argument(
         "-o",
         "--output",
-        help="Output file path (default: current directory with original name)",
+        help="Output file path, or directory when downloading several files (default: current directory with original name)",
+    )
+    download_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=24,
+        help="Maximum number of small files to download at once; large files are limited to 2 (default: 24)",
     )
-    download_parser.set_defaults(func=cmd_download)
+    download_parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="Skip files that already exist locally with the same size and MD5 checksum",
+    )
+
 
-    # Info subcommand - show file metadata
+def _add_info_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the 'info' subcommand."""
     info_parser = subparsers.add_parser(
         "info",
         help="Show file metadata",
@@ -90,9 +92,10 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Show comments (automatically enabled with -v)",
     )
-    info_parser.set_defaults(func=cmd_info)
 
-    # List subcommand - list files
+
+def _add_list_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the 'list' subcommand."""
     list_parser = subparsers.add_parser(
         "list",
         help="List files from Google Drive",
@@ -126,9 +129,10 @@ def build_parser() -> argparse.ArgumentParser:
         default="modifiedTime desc",
         help="Sort order (default: modifiedTime desc)",
     )
-    list_parser.set_defaults(func=cmd_list)
 
-    # Tasks subcommand - list Google Tasks
+
+def _add_tasks_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the 'tasks' subcommand."""
     tasks_parser = subparsers.add_parser(
         "tasks",
         help="List Google Tasks",
@@ -164,18 +168,89 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Show all task lists instead of tasks",
     )
-    tasks_parser.set_defaults(func=cmd_tasks)
+
+
+def _add_cache_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Register the 'cache' subcommand."""
+    cache_parser = subparsers.add_parser(
+        "cache",
+        help="Manage the local metadata cache",
+        description="Manage the on-disk cache of file metadata and listings (see GCMD_CACHE_TTL)",
+    )
+    cache_subparsers = cache_parser.add_subparsers(dest="cache_command", metavar="<action>")
+    cache_subparsers.required = True
+    cache_subparsers.add_parser(
+        "clear",
+        help="Delete all cached metadata and listings",
+    )
+
+
+# Subcommand handlers, as "module:function" strings so that building the
+# parser (e.g. for --help) doesn't need to resolve or import any of them
+_COMMANDS = {
+    "export": "gcmd.cli:cmd_export",
+    "download": "gcmd.cli:cmd_download",
+    "info": "gcmd.cli:cmd_info",
+    "list": "gcmd.cli:cmd_list",
+    "tasks": "gcmd.cli:cmd_tasks",
+    "cache": "gcmd.cli:cmd_cache",
+}
+
+_SUBCOMMAND_PARSERS = {
+    "export": _add_export_parser,
+    "download": _add_download_parser,
+    "info": _add_info_parser,
+    "list": _add_list_parser,
+    "tasks": _add_tasks_parser,
+    "cache": _add_cache_parser,
+}
+
+
+def build_parser(command: Optional[str] = None) -> argparse.ArgumentParser:
+    """
+    Build the argument parser.
+
+    Args:
+        command: If given, only register this subcommand's parser. Used by
+            main() to skip building parsers for subcommands that aren't run.
+
+    Returns:
+        The configured ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog="gcmd",
+        description="Command-line utilities for Google services (Drive, Docs, Sheets, and more)",
+    )
+
+    parser.add_argument(
+        "-V",
+        "--version",
+        action="version",
+        version=f"gcmd {__version__}",
+        help="Show the gcmd version and exit",
+    )
+
+    subparsers = parser.add_subparsers(dest="command", metavar="<command>")
+    subparsers.required = False
+
+    for name, add_parser in _SUBCOMMAND_PARSERS.items():
+        if command is None or name == command:
+            add_parser(subparsers)
 
     return parser
 
 
 def cmd_export(args: argparse.Namespace) -> int:
     """Handle the 'export' subcommand."""
+    from .download import export_google_doc_as_markdown, get_file_metadata
+    from .docs import export_all_tabs
+    from .sheets import export_spreadsheet_as_csv
+
     try:
         file_id = extract_file_id(args.file_id_or_url)
 
         # Get file metadata to determine type
-        metadata = get_file_metadata(file_id)
+        metadata = get_file_metadata(file_id, fields="id,name,mimeType")
         mime_type = metadata.get("mimeType", "")
 
         # Handle Google Sheets - export as CSV
@@ -207,7 +282,7 @@ def cmd_export(args: argparse.Namespace) -> int:
                 return 0
             else:
                 # Single file export (original behavior)
-                result = export_google_doc_as_markdown(file_id, args.output)
+                result = export_google_doc_as_markdown(file_id, args.output, metadata=metadata)
                 if result != "stdout":
                     print(f"Exported to: {result}", file=sys.stderr)
                 return 0
@@ -225,77 +300,137 @@ def cmd_export(args: argparse.Namespace) -> int:
 
 def cmd_download(args: argparse.Namespace) -> int:
     """Handle the 'download' subcommand."""
+    from .download import (
+        CHECKSUM_FILE_FIELDS,
+        download_file,
+        download_many,
+        find_unchanged_copy,
+        get_file_metadata,
+    )
+
     try:
-        file_id = extract_file_id(args.file_id_or_url)
-        result = download_file(file_id, args.output)
-        print(f"Downloaded to: {result}", file=sys.stderr)
-        return 0
+        file_ids = [extract_file_id(value) for value in args.file_id_or_url]
+        if len(file_ids) == 1:
+            metadata = None
+            if args.skip_unchanged:
+                metadata = get_file_metadata(file_ids[0], fields=CHECKSUM_FILE_FIELDS, cached=False)
+                existing = find_unchanged_copy(metadata, args.output)
+                if existing is not None:
+                    print(f"Skipped (unchanged): {existing}", file=sys.stderr)
+                    return 0
+            result = download_file(file_ids[0], args.output, metadata=metadata)
+            print(f"Downloaded to: {result}", file=sys.stderr)
+            return 0
+
+        results = download_many(
+            file_ids,
+            args.output or ".",
+            max_workers=max(1, args.jobs),
+            skip_unchanged=args.skip_unchanged,
+        )
+        failed = [file_id for file_id, path in results.items() if path is None]
+        downloaded = len(results) - len(failed)
+        print(f"Downloaded {downloaded} of {len(results)} files to: {args.output or '.'}", file=sys.stderr)
+        return 1 if failed else 0
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
 
 
+def _fetch_document_outline(file_id: str) -> tuple:
+    """Fetch the tabs and heading structure of a Google Doc."""
+    from .docs import list_document_tabs, get_document_structure
+
+    return list_document_tabs(file_id), get_document_structure(file_id)
+
+
 def cmd_info(args: argparse.Namespace) -> int:
     """Handle the 'info' subcommand."""
+    from .download import get_file_metadata, FILE_FIELDS, DETAILED_FILE_FIELDS
+    from .docs import format_tabs_output, format_headings_output
+    from .comments import list_comments, format_comments_output
+
     try:
         file_id = extract_file_id(args.file_id_or_url)
-        metadata = get_file_metadata(file_id, detailed=args.verbose)
+
+        # Only request the fields that will be printed
+        fields = DETAILED_FILE_FIELDS if args.verbose else FILE_FIELDS
+        metadata = get_file_metadata(file_id, fields=fields)
+        mime_type = metadata.get('mimeType')
+
+        # Fetch the document structure (Docs API) and comments (Drive API)
+        # concurrently while the metadata is printed, instead of one after
+        # the other.
+        executor = ThreadPoolExecutor(max_workers=2)
+        outline_future = None
+        if args.verbose and mime_type == 'application/vnd.google-apps.document':
+            outline_future = executor.submit(_fetch_document_outline, file_id)
+        comments_future = None
+        if args.verbose or args.show_comments:
+            comments_future = executor.submit(list_comments, file_id)
+        executor.shutdown(wait=False)
         
+        # Collect the output and write it in one go at the end
+        lines = []
+
         # Basic information
-        print(f"\n{'='*70}")
-        print(f"FILE INFORMATION")
-        print(f"{'='*70}\n")
+        lines.append(f"\n{_DIV}")
+        lines.append(f"FILE INFORMATION")
+        lines.append(f"{_DIV}\n")
         
-        print(f"Name: {metadata.get('name')}")
-        print(f"ID: {metadata.get('id')}")
-        print(f"Type: {metadata.get('mimeType')}")
+        lines.append(f"Name: {metadata.get('name')}")
+        lines.append(f"ID: {metadata.get('id')}")
+        lines.append(f"Type: {mime_type}")
         
-        if metadata.get('size'):
-            size_mb = int(metadata['size']) / (1024 * 1024)
-            print(f"Size: {size_mb:.2f} MB")
+        size = metadata.get('size')
+        if size:
+            lines.append(f"Size: {format_file_size(size)}")
         
-        print(f"\nCreated: {metadata.get('createdTime')}")
-        print(f"Modified: {metadata.get('modifiedTime')}")
+        lines.append(f"\nCreated: {metadata.get('createdTime')}")
+        lines.append(f"Modified: {metadata.get('modifiedTime')}")
         
-        if metadata.get('webViewLink'):
-            print(f"\nWeb Link: {metadata.get('webViewLink')}")
+        web_link = metadata.get('webViewLink')
+        if web_link:
+            lines.append(f"\nWeb Link: {web_link}")
         
         # Detailed information
         if args.verbose:
-            print(f"\n{'='*70}")
-            print(f"DETAILED INFORMATION")
-            print(f"{'='*70}\n")
+            lines.append(f"\n{_DIV}")
+            lines.append(f"DETAILED INFORMATION")
+            lines.append(f"{_DIV}\n")
             
             # Owner information
             owners = metadata.get('owners', [])
             if owners:
-                print(f"Owner(s):")
+                lines.append(f"Owner(s):")
                 for owner in owners:
-                    print(f"  - {owner.get('displayName', 'Unknown')} ({owner.get('emailAddress', 'N/A')})")
+                    lines.append(f"  - {owner.get('displayName', 'Unknown')} ({owner.get('emailAddress', 'N/A')})")
             
             # Last modifier
             last_modifier = metadata.get('lastModifyingUser', {})
             if last_modifier:
-                print(f"\nLast Modified By: {last_modifier.get('displayName', 'Unknown')} ({last_modifier.get('emailAddress', 'N/A')})")
+                lines.append(f"\nLast Modified By: {last_modifier.get('displayName', 'Unknown')} ({last_modifier.get('emailAddress', 'N/A')})")
             
             # Sharing info
-            print(f"\nShared: {metadata.get('shared', False)}")
+            lines.append(f"\nShared: {metadata.get('shared', False)}")
             if metadata.get('starred'):
-                print(f"Starred: Yes")
+                lines.append(f"Starred: Yes")
             
-            if metadata.get('description'):
-                print(f"\nDescription: {metadata.get('description')}")
+            description = metadata.get('description')
+            if description:
+                lines.append(f"\nDescription: {description}")
             
             # Version
-            if metadata.get('version'):
-                print(f"\nVersion: {metadata.get('version')}")
+            version = metadata.get('version')
+            if version:
+                lines.append(f"\nVersion: {version}")
             
             # Permissions
             permissions = metadata.get('permissions', [])
             if permissions:
-                print(f"\n{'='*70}")
-                print(f"PERMISSIONS ({len(permissions)} total)")
-                print(f"{'='*70}\n")
+                lines.append(f"\n{_DIV}")
+                lines.append(f"PERMISSIONS ({len(permissions)} total)")
+                lines.append(f"{_DIV}\n")
                 for perm in permissions:
                     perm_type = perm.get('type', 'unknown')
                     role = perm.get('role', 'unknown')
@@ -303,96 +438,100 @@ def cmd_info(args: argparse.Namespace) -> int:
                     if perm_type == 'user':
                         email = perm.get('emailAddress', 'N/A')
                         display_name = perm.get('displayName', email)
-                        print(f"  👤 {display_name} ({email}): {role}")
+                        lines.append(f"  👤 {display_name} ({email}): {role}")
                     elif perm_type == 'group':
                         email = perm.get('emailAddress', 'N/A')
-                        print(f"  👥 Group ({email}): {role}")
+                        lines.append(f"  👥 Group ({email}): {role}")
                     elif perm_type == 'domain':
                         domain = perm.get('domain', 'N/A')
-                        print(f"  🏢 Domain ({domain}): {role}")
+                        lines.append(f"  🏢 Domain ({domain}): {role}")
                     elif perm_type == 'anyone':
-                        print(f"  🌍 Anyone with link: {role}")
+                        lines.append(f"  🌍 Anyone with link: {role}")
             
             # Capabilities
             capabilities = metadata.get('capabilities', {})
             if capabilities:
-                print(f"\n{'='*70}")
-                print(f"CAPABILITIES")
-                print(f"{'='*70}\n")
+                lines.append(f"\n{_DIV}")
+                lines.append(f"CAPABILITIES")
+                lines.append(f"{_DIV}\n")
                 
                 key_caps = ['canEdit', 'canComment', 'canShare', 'canDownload', 'canCopy', 'canDelete']
                 for cap in key_caps:
                     if cap in capabilities:
                         status = "✓ Yes" if capabilities[cap] else "✗ No"
                         cap_name = cap.replace('can', '')
-                        print(f"  {cap_name}: {status}")
+                        lines.append(f"  {cap_name}: {status}")
             
             # For Google Docs, show tabs and structure
-            if metadata.get('mimeType') == 'application/vnd.google-apps.document':
+            if outline_future is not None:
                 try:
-                    print(f"\n{'='*70}")
-                    print(f"DOCUMENT STRUCTURE")
-                    print(f"{'='*70}\n")
+                    lines.append(f"\n{_DIV}")
+                    lines.append(f"DOCUMENT STRUCTURE")
+                    lines.append(f"{_DIV}\n")
                     
-                    # Get tabs
-                    tabs = list_document_tabs(file_id)
+                    tabs, structure = outline_future.result()
+
+                    # Tabs
                     if tabs:
-                        print(f"Tabs ({len(tabs)}):")
-                        print(format_tabs_output(tabs))
+                        lines.append(f"Tabs ({len(tabs)}):")
+                        lines.append(format_tabs_output(tabs))
                     
-                    # Get document structure (headings)
-                    structure = get_document_structure(file_id)
+                    # Document structure (headings)
                     headings = structure.get('headings', [])
                     if headings:
-                        print(f"\nHeadings ({len(headings)}):")
-                        print(format_headings_output(headings))
+                        lines.append(f"\nHeadings ({len(headings)}):")
+                        lines.append(format_headings_output(headings))
                     
                 except Exception as doc_error:
-                    print(f"\nNote: Could not retrieve document structure: {doc_error}")
+                    lines.append(f"\nNote: Could not retrieve document structure: {doc_error}")
         
         # Show comments if requested (or if verbose)
-        if args.verbose or args.show_comments:
+        if comments_future is not None:
             try:
-                comments = list_comments(file_id)
+                comments = comments_future.result()
                 if comments:
-                    print(f"\n{'='*70}")
-                    print(f"COMMENTS")
-                    print(format_comments_output(comments))
+                    lines.append(f"\n{_DIV}")
+                    lines.append(f"COMMENTS")
+                    lines.append(format_comments_output(comments))
                 else:
-                    print(f"\n{'='*70}")
-                    print(f"COMMENTS")
-                    print(f"{'='*70}\n")
-                    print("No comments on this file.")
-                    print(f"\n{'='*70}\n")
+                    lines.append(f"\n{_DIV}")
+                    lines.append(f"COMMENTS")
+                    lines.append(f"{_DIV}\n")
+                    lines.append("No comments on this file.")
+                    lines.append(f"\n{_DIV}\n")
             except Exception as comment_error:
-                print(f"\nNote: Could not retrieve comments: {comment_error}")
+                lines.append(f"\nNote: Could not retrieve comments: {comment_error}")
         
-        print(f"\n{'='*70}\n")
+        lines.append(f"\n{_DIV}\n")
+        sys.stdout.write("\n".join(lines) + "\n")
         return 0
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
 
 
+# Map `list --type` shortcuts to MIME types
+_TYPE_MAP = MappingProxyType({
+    "docs": "application/vnd.google-apps.document",
+    "sheets": "application/vnd.google-apps.spreadsheet",
+    "slides": "application/vnd.google-apps.presentation",
+    "folders": "application/vnd.google-apps.folder",
+})
+
+
 def cmd_list(args: argparse.Namespace) -> int:
     """Handle the 'list' subcommand."""
+    from .list import list_files, format_file_list
+
     try:
-        # Map type shortcuts to MIME types
-        mime_type = None
-        if args.type:
-            type_map = {
-                "docs": "application/vnd.google-apps.document",
-                "sheets": "application/vnd.google-apps.spreadsheet",
-                "slides": "application/vnd.google-apps.presentation",
-                "folders": "application/vnd.google-apps.folder",
-            }
-            mime_type = type_map.get(args.type.lower(), args.type)
+        mime_type = _TYPE_MAP.get(args.type.lower(), args.type) if args.type else None
 
         files = list_files(
             query=args.query,
             mime_type=mime_type,
             max_results=args.max_results,
             order_by=args.order_by,
+            verbose=args.verbose,
         )
 
         output = format_file_list(files, verbose=args.verbose)
@@ -409,6 +548,8 @@ def cmd_list(args: argparse.Namespace) -> int:
 
 def cmd_tasks(args: argparse.Namespace) -> int:
     """Handle the 'tasks' subcommand."""
+    from .tasks import list_tasks, list_task_lists, format_task_list, format_task_lists
+
     try:
         # Show all task lists if requested
         if args.list_all_lists:
@@ -440,12 +581,49 @@ def cmd_tasks(args: argparse.Namespace) -> int:
         return 1
 
 
+def cmd_cache(args: argparse.Namespace) -> int:
+    """Handle the 'cache' subcommand."""
+    from .cache import clear, get_cache_path
+
+    if args.cache_command == "clear":
+        if clear():
+            print(f"Cleared cache: {get_cache_path()}", file=sys.stderr)
+        else:
+            print("Cache is already empty", file=sys.stderr)
+    return 0
+
+
+def _configure_logging() -> None:
+    """Send gcmd progress and warning messages to stderr through one handler."""
+    logger = logging.getLogger("gcmd")
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
 def main(argv: list[str] | None = None) -> int:
-    parser = build_parser()
+    if argv is None:
+        argv = sys.argv[1:]
+
+    # Answer --version without building any parsers
+    if argv in (["-V"], ["--version"]):
+        print(f"gcmd {__version__}")
+        return 0
+
+    # Only build the parser for the subcommand being run
+    command = argv[0] if argv and argv[0] in _SUBCOMMAND_PARSERS else None
+    parser = build_parser(command)
     args = parser.parse_args(argv)
 
-    if hasattr(args, "func"):
-        return int(args.func(args))
+    if args.command:
+        _configure_logging()
+        module_name, func_name = _COMMANDS[args.command].split(":")
+        func = getattr(importlib.import_module(module_name), func_name)
+        return int(func(args))
 
     # No subcommand: show help
     parser.print_help()
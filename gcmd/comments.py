@@ -2,10 +2,21 @@
 Comments functionality for Google Drive files.
 """
 
-from typing import List, Dict
+from typing import Iterator, List, Dict, Union
 from googleapiclient.errors import HttpError
 
-from .client import get_drive_service
+from .client import batch_execute, get_drive_service
+
+# Section divider used in formatted output
+_DIV = "=" * 70
+
+
+# Only the comment fields format_comments_output reads
+_COMMENT_FIELDS = (
+    "comments(id,content,author/displayName,createdTime,modifiedTime,"
+    "resolved,deleted,replies(author/displayName,content,createdTime),"
+    "quotedFileContent/value,anchor)"
+)
 
 
 def list_comments(file_id: str, include_deleted: bool = False) -> List[Dict]:
@@ -24,7 +35,7 @@ def list_comments(file_id: str, include_deleted: bool = False) -> List[Dict]:
     try:
         results = service.comments().list(
             fileId=file_id,
-            fields="comments(id,content,author,createdTime,modifiedTime,resolved,deleted,replies,quotedFileContent,anchor)",
+            fields=_COMMENT_FIELDS,
             includeDeleted=include_deleted
         ).execute()
         
@@ -35,21 +46,48 @@ def list_comments(file_id: str, include_deleted: bool = False) -> List[Dict]:
         raise Exception(f"Failed to list comments: {e}")
 
 
-def format_comments_output(comments: List[Dict]) -> str:
+def list_comments_for_files(
+    file_ids: List[str], include_deleted: bool = False
+) -> Dict[str, Union[List[Dict], Exception]]:
     """
-    Format comments for display.
+    List the comments on several Google Drive files using batch requests.
+    
+    A file whose comments can't be listed (e.g. a 404) doesn't fail the
+    others; its entry is the exception instead.
     
     Args:
-        comments: List of comment dictionaries
+        file_ids: Google Drive file IDs
+        include_deleted: Include deleted comments
         
     Returns:
-        Formatted string
+        Dictionary mapping each file ID to its list of comment dictionaries,
+        or to the Exception its lookup failed with
     """
-    if not comments:
-        return "No comments found."
+    service = get_drive_service()
     
-    output = []
+    calls = [
+        service.comments().list(
+            fileId=file_id,
+            fields=_COMMENT_FIELDS,
+            includeDeleted=include_deleted
+        )
+        for file_id in file_ids
+    ]
     
+    comments_by_file = {}
+    for file_id, result in zip(file_ids, batch_execute(service, calls)):
+        if isinstance(result, HttpError):
+            comments_by_file[file_id] = Exception(
+                f"Failed to list comments for {file_id}: {result}"
+            )
+        else:
+            comments_by_file[file_id] = result.get("comments", [])
+    
+    return comments_by_file
+
+
+def _comments_lines(comments: List[Dict]) -> Iterator[str]:
+    """Yield the output lines for format_comments_output."""
     for comment in comments:
         author = comment.get("author", {})
         author_name = author.get("displayName", "Unknown")
@@ -70,32 +108,45 @@ def format_comments_output(comments: List[Dict]) -> str:
         elif resolved:
             status = " [RESOLVED]"
         
-        output.append(f"\n{'='*70}")
-        output.append(f"💬 {author_name}{status}")
-        output.append(f"{'='*70}")
-        output.append(f"Created: {created}")
+        yield f"\n{_DIV}"
+        yield f"💬 {author_name}{status}"
+        yield _DIV
+        yield f"Created: {created}"
         
         if quoted_text:
-            output.append(f"\nQuoted text:")
-            output.append(f'  "{quoted_text}"')
+            yield "\nQuoted text:"
+            yield f'  "{quoted_text}"'
         
-        output.append(f"\n{content}")
+        yield f"\n{content}"
         
         # Show replies if any
         replies = comment.get("replies", [])
         if replies:
-            output.append(f"\n  Replies ({len(replies)}):")
+            yield f"\n  Replies ({len(replies)}):"
             for reply in replies:
                 reply_author = reply.get("author", {})
                 reply_author_name = reply_author.get("displayName", "Unknown")
                 reply_content = reply.get("content", "").strip()
                 reply_created = reply.get("createdTime", "")
                 
-                output.append(f"\n  ↳ {reply_author_name} ({reply_created}):")
-                output.append(f"    {reply_content}")
-    
-    output.append(f"\n{'='*70}\n")
-    output.append(f"Total comments: {len(comments)}")
+                yield f"\n  ↳ {reply_author_name} ({reply_created}):"
+                yield f"    {reply_content}"
     
-    return "\n".join(output)
+    yield f"\n{_DIV}\n"
+    yield f"Total comments: {len(comments)}"
 
+
+def format_comments_output(comments: List[Dict]) -> str:
+    """
+    Format comments for display.
+    
+    Args:
+        comments: List of comment dictionaries
+        
+    Returns:
+        Formatted string
+    """
+    if not comments:
+        return "No comments found."
+    
+    return "\n".join(_comments_lines(comments))
@@ -2,11 +2,17 @@
 Google Docs API functionality for detailed document inspection.
 """
 
-import json
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import List, Dict, Optional
 from googleapiclient.errors import HttpError
 
 from .client import get_docs_service
+from .utils import json_dumps, sanitize_filename
+
+logger = logging.getLogger(__name__)
 
 
 def get_document_details(document_id: str, include_tabs: bool = True) -> dict:
@@ -33,55 +39,275 @@ def get_document_details(document_id: str, include_tabs: bool = True) -> dict:
         raise Exception(f"Failed to get document details: {e}")
 
 
-def list_document_tabs(document_id: str) -> List[Dict]:
+def _extract_text(elements: List[Dict]) -> str:
     """
-    List all tabs in a Google Doc.
-    
+    Extract all text from a list of Docs API structural elements.
+
+    Walks paragraphs and tables (including nested tables) depth-first with an
+    explicit stack, so deeply nested content can't hit the recursion limit.
+
     Args:
-        document_id: Google Docs document ID
-        
+        elements: Structural elements, e.g. a body's `content` list
+
     Returns:
-        List of tab information dictionaries
+        The concatenated text content
+    """
+    text = []
+    # Elements are pushed in reverse so they pop off in document order
+    stack = list(reversed(elements))
+    while stack:
+        element = stack.pop()
+        if 'textRun' in element:
+            text.append(element['textRun'].get('content', ''))
+        elif 'paragraph' in element:
+            stack.extend(reversed(element['paragraph'].get('elements', [])))
+        elif 'table' in element:
+            cells = [
+                cell
+                for row in element['table'].get('tableRows', [])
+                for cell in row.get('tableCells', [])
+            ]
+            for cell in reversed(cells):
+                stack.extend(reversed(cell.get('content', [])))
+    return ''.join(text)
+
+
+class DocumentContext:
+    """
+    A Google Doc fetched once, with all inspection and export helpers
+    working from the in-memory document instead of re-fetching it.
     """
-    document = get_document_details(document_id)
     
-    tabs = document.get('tabs', [])
-    if not tabs:
-        # Older documents might not have explicit tabs, just return the body
-        return [{
-            'tabId': 'default',
-            'title': document.get('title', 'Untitled'),
-            'index': 0,
-            'isDefault': True
-        }]
+    def __init__(self, document_id: str, document: Optional[dict] = None):
+        """
+        Args:
+            document_id: Google Docs document ID
+            document: Previously fetched document (with tabs content). If not
+                provided, it is fetched from the API.
+        """
+        self.document_id = document_id
+        if document is None:
+            document = get_document_details(document_id, include_tabs=True)
+        self.doc = document
+    
+    @functools.cached_property
+    def _tabs_by_id(self) -> Dict[str, Dict]:
+        """Map each tab's ID to its tab object, built once per document."""
+        return {
+            tab.get('tabProperties', {}).get('tabId'): tab
+            for tab in self.doc.get('tabs', [])
+        }
+    
+    def list_tabs(self) -> List[Dict]:
+        """
+        List all tabs in the document.
+        
+        Returns:
+            List of tab information dictionaries
+        """
+        document = self.doc
+        
+        tabs = document.get('tabs', [])
+        if not tabs:
+            # Older documents might not have explicit tabs, just return the body
+            return [{
+                'tabId': 'default',
+                'title': document.get('title', 'Untitled'),
+                'index': 0,
+                'isDefault': True
+            }]
+        
+        tab_list = []
+        for idx, tab in enumerate(tabs):
+            # Tab properties might be at different levels
+            tab_properties = tab.get('tabProperties', {})
+            
+            # Try to get the title from various possible locations
+            title = (
+                tab_properties.get('title') or
+                tab_properties.get('displayName') or
+                tab.get('title') or
+                tab.get('displayName') or
+                f'Tab {idx + 1}'
+            )
+            
+            tab_info = {
+                'tabId': tab_properties.get('tabId') or tab.get('tabId', f'tab_{idx}'),
+                'title': title,
+                'index': tab_properties.get('index', idx),
+            }
+            
+            # Add any additional metadata
+            if 'childObjectId' in tab:
+                tab_info['childObjectId'] = tab['childObjectId']
+            
+            tab_list.append(tab_info)
+        
+        return tab_list
     
-    tab_list = []
-    for idx, tab in enumerate(tabs):
-        # Tab properties might be at different levels
-        tab_properties = tab.get('tabProperties', {})
+    def structure(self) -> Dict:
+        """
+        Get the structure of the document including headings and outline.
         
-        # Try to get the title from various possible locations
-        title = (
-            tab_properties.get('title') or 
-            tab_properties.get('displayName') or
-            tab.get('title') or
-            tab.get('displayName') or
-            f'Tab {idx + 1}'
-        )
+        Returns:
+            Dictionary with document structure information
+        """
+        document = self.doc
         
-        tab_info = {
-            'tabId': tab_properties.get('tabId') or tab.get('tabId', f'tab_{idx}'),
-            'title': title,
-            'index': tab_properties.get('index', idx),
+        # Extract headings and structure
+        body = document.get('body', {})
+        content = body.get('content', [])
+        
+        headings = []
+        for element in content:
+            if 'paragraph' in element:
+                paragraph = element['paragraph']
+                style = paragraph.get('paragraphStyle', {})
+                named_style = style.get('namedStyleType', '')
+                
+                if named_style.startswith('HEADING_'):
+                    # Extract heading text
+                    elements = paragraph.get('elements', [])
+                    text = ''.join([
+                        e.get('textRun', {}).get('content', '')
+                        for e in elements
+                        if 'textRun' in e
+                    ])
+                    
+                    level = named_style.replace('HEADING_', '')
+                    headings.append({
+                        'level': level,
+                        'text': text.strip(),
+                        'style': named_style
+                    })
+        
+        return {
+            'title': document.get('title', 'Untitled'),
+            'documentId': document.get('documentId'),
+            'headings': headings,
+            'revisionId': document.get('revisionId'),
         }
+    
+    def dump_raw(self, output_file: Optional[str] = None) -> str:
+        """
+        Dump raw document JSON for debugging.
+        
+        Args:
+            output_file: Optional file to write JSON to
+        
+        Returns:
+            JSON string of document, or output_file if one was given
+        """
+        data = json_dumps(self.doc, indent=True)
         
-        # Add any additional metadata
-        if 'childObjectId' in tab:
-            tab_info['childObjectId'] = tab['childObjectId']
+        if output_file:
+            # Write the encoded bytes directly, skipping a decode/encode round trip
+            Path(output_file).write_bytes(data)
+            return output_file
+        else:
+            return data.decode('utf-8')
+    
+    def export_tab(self, tab_id: str) -> str:
+        """
+        Export a specific tab as plain text.
         
-        tab_list.append(tab_info)
+        Args:
+            tab_id: The tab ID to export
+        
+        Returns:
+            Plain text content of the tab
+        """
+        target_tab = self._tabs_by_id.get(tab_id)
+        if not target_tab:
+            raise Exception(f"Tab {tab_id} not found in document")
+        
+        content = target_tab.get('documentTab', {}).get('body', {}).get('content', [])
+        return _extract_text(content)
     
-    return tab_list
+    def export_all_tabs(self, output_dir: str = ".") -> List[str]:
+        """
+        Export all tabs as separate text files.
+        
+        Args:
+            output_dir: Directory to save the files
+        
+        Returns:
+            List of file paths that were created
+        """
+        tabs = self.list_tabs()
+        
+        # Get document title for base filename
+        doc_title = self.doc.get('title', 'document')
+        
+        # Sanitize filename
+        safe_title = sanitize_filename(doc_title)
+        
+        output_path = Path(output_dir).expanduser()
+        output_path.mkdir(parents=True, exist_ok=True)
+        
+        def export_one(tab: Dict) -> Optional[str]:
+            tab_id = tab['tabId']
+            tab_title = tab['title']
+            
+            # Sanitize tab title for filename
+            safe_tab_title = sanitize_filename(tab_title)
+            
+            # Create filename with "exported" to match .gitignore pattern
+            if len(tabs) == 1:
+                filename = f"{safe_title}.exported.md"
+            else:
+                filename = f"{safe_title} - {safe_tab_title}.exported.md"
+            
+            filepath = output_path / filename
+            
+            try:
+                # Export the tab as markdown
+                content = self.export_tab(tab_id)
+                
+                # Write to file
+                filepath.write_bytes(content.encode('utf-8'))
+                return str(filepath)
+            
+            except Exception as e:
+                logger.warning("Warning: Failed to export tab '%s': %s", tab_title, e)
+                return None
+        
+        # Tabs are independent, so extract and write them concurrently
+        with ThreadPoolExecutor(max_workers=min(8, len(tabs))) as executor:
+            results = list(executor.map(export_one, tabs))
+        
+        # Keep the files in tab order, dropping tabs that failed
+        exported_files = [path for path in results if path is not None]
+        
+        return exported_files
+
+
+@functools.lru_cache(maxsize=16)
+def _context(document_id: str) -> DocumentContext:
+    """Get the DocumentContext for a document, fetching it once per process."""
+    return DocumentContext(document_id)
+
+
+def _get_context(document_id: str, document: Optional[dict] = None) -> DocumentContext:
+    """Wrap a previously fetched document, or fall back to the cached context."""
+    if document is not None:
+        return DocumentContext(document_id, document)
+    return _context(document_id)
+
+
+def list_document_tabs(document_id: str, document: Optional[dict] = None) -> List[Dict]:
+    """
+    List all tabs in a Google Doc.
+    
+    Args:
+        document_id: Google Docs document ID
+        document: Previously fetched document (with tabs content). If not
+            provided, it is fetched from the API.
+        
+    Returns:
+        List of tab information dictionaries
+    """
+    return _get_context(document_id, document).list_tabs()
 
 
 def get_document_structure(document_id: str) -> Dict:
@@ -94,41 +320,7 @@ def get_document_structure(document_id: str) -> Dict:
     Returns:
         Dictionary with document structure information
     """
-    document = get_document_details(document_id)
-    
-    # Extract headings and structure
-    body = document.get('body', {})
-    content = body.get('content', [])
-    
-    headings = []
-    for element in content:
-        if 'paragraph' in element:
-            paragraph = element['paragraph']
-            style = paragraph.get('paragraphStyle', {})
-            named_style = style.get('namedStyleType', '')
-            
-            if named_style.startswith('HEADING_'):
-                # Extract heading text
-                elements = paragraph.get('elements', [])
-                text = ''.join([
-                    e.get('textRun', {}).get('content', '')
-                    for e in elements
-                    if 'textRun' in e
-                ])
-                
-                level = named_style.replace('HEADING_', '')
-                headings.append({
-                    'level': level,
-                    'text': text.strip(),
-                    'style': named_style
-                })
-    
-    return {
-        'title': document.get('title', 'Untitled'),
-        'documentId': document.get('documentId'),
-        'headings': headings,
-        'revisionId': document.get('revisionId'),
-    }
+    return _context(document_id).structure()
 
 
 def format_tabs_output(tabs: List[Dict]) -> str:
@@ -144,11 +336,7 @@ def format_tabs_output(tabs: List[Dict]) -> str:
     if not tabs:
         return "No tabs found."
     
-    output = []
-    for tab in tabs:
-        output.append(f"  📄 {tab['title']} (ID: {tab['tabId']})")
-    
-    return "\n".join(output)
+    return "\n".join(f"  📄 {tab['title']} (ID: {tab['tabId']})" for tab in tabs)
 
 
 def dump_document_raw(document_id: str, output_file: Optional[str] = None) -> str:
@@ -162,18 +350,10 @@ def dump_document_raw(document_id: str, output_file: Optional[str] = None) -> st
     Returns:
         JSON string of document
     """
-    document = get_document_details(document_id)
-    json_str = json.dumps(document, indent=2)
-    
-    if output_file:
-        with open(output_file, 'w') as f:
-            f.write(json_str)
-        return output_file
-    else:
-        return json_str
+    return _context(document_id).dump_raw(output_file)
 
 
-def export_tab_as_markdown(document_id: str, tab_id: str) -> str:
+def export_tab_as_markdown(document_id: str, tab_id: str, document: Optional[dict] = None) -> str:
     """
     Export a specific tab from a Google Doc as plain text.
     
@@ -184,55 +364,15 @@ def export_tab_as_markdown(document_id: str, tab_id: str) -> str:
     Args:
         document_id: Google Docs document ID
         tab_id: The tab ID to export
+        document: Previously fetched document (with tabs content). If not
+            provided, it is fetched from the API.
         
     Returns:
         Plain text content of the tab
     """
-    from .client import get_drive_service
-    import io
-    from googleapiclient.http import MediaIoBaseDownload
-    
     # Unfortunately, Google Drive API doesn't support exporting individual tabs
     # We have to extract text from the Docs API structure
-    doc_service = get_docs_service()
-    
-    try:
-        document = doc_service.documents().get(
-            documentId=document_id,
-            includeTabsContent=True
-        ).execute()
-        
-        # Find the specific tab
-        tabs = document.get('tabs', [])
-        target_tab = None
-        for tab in tabs:
-            tab_props = tab.get('tabProperties', {})
-            if tab_props.get('tabId') == tab_id:
-                target_tab = tab
-                break
-        
-        if not target_tab:
-            raise Exception(f"Tab {tab_id} not found in document")
-        
-        # Use a simple recursive function to extract all text
-        def extract_text(elements):
-            text = []
-            for element in elements:
-                if 'textRun' in element:
-                    text.append(element['textRun'].get('content', ''))
-                elif 'paragraph' in element:
-                    text.extend(extract_text(element['paragraph'].get('elements', [])))
-                elif 'table' in element:
-                    for row in element['table'].get('tableRows', []):
-                        for cell in row.get('tableCells', []):
-                            text.extend(extract_text(cell.get('content', [])))
-            return text
-        
-        content = target_tab.get('documentTab', {}).get('body', {}).get('content', [])
-        return ''.join(extract_text(content))
-        
-    except HttpError as e:
-        raise Exception(f"Failed to export tab: {e}")
+    return _get_context(document_id, document).export_tab(tab_id)
 
 
 def export_all_tabs(document_id: str, output_dir: str = ".") -> List[str]:
@@ -246,51 +386,7 @@ def export_all_tabs(document_id: str, output_dir: str = ".") -> List[str]:
     Returns:
         List of file paths that were created
     """
-    from pathlib import Path
-    import re
-    
-    # Get all tabs
-    tabs = list_document_tabs(document_id)
-    
-    # Get document title for base filename
-    document = get_document_details(document_id)
-    doc_title = document.get('title', 'document')
-    
-    # Sanitize filename
-    safe_title = re.sub(r'[<>:"/\\|?*]', '_', doc_title)
-
-    output_path = Path(output_dir).expanduser()
-    output_path.mkdir(parents=True, exist_ok=True)
-    
-    exported_files = []
-    
-    for tab in tabs:
-        tab_id = tab['tabId']
-        tab_title = tab['title']
-        
-        # Sanitize tab title for filename
-        safe_tab_title = re.sub(r'[<>:"/\\|?*]', '_', tab_title)
-        
-        # Create filename with "exported" to match .gitignore pattern
-        if len(tabs) == 1:
-            filename = f"{safe_title}.exported.md"
-        else:
-            filename = f"{safe_title} - {safe_tab_title}.exported.md"
-        
-        filepath = output_path / filename
-        
-        try:
-            # Export the tab as markdown
-            content = export_tab_as_markdown(document_id, tab_id)
-            
-            # Write to file
-            filepath.write_text(content)
-            exported_files.append(str(filepath))
-            
-        except Exception as e:
-            print(f"Warning: Failed to export tab '{tab_title}': {e}")
-    
-    return exported_files
+    return _context(document_id).export_all_tabs(output_dir)
 
 
 def format_headings_output(headings: List[Dict]) -> str:
@@ -306,11 +402,11 @@ def format_headings_output(headings: List[Dict]) -> str:
     if not headings:
         return "No headings found."
     
-    output = []
-    for heading in headings:
-        level = heading['level']
-        indent = "  " * (int(level) if level.isdigit() else 1)
-        output.append(f"{indent}• {heading['text']}")
+    def lines():
+        for heading in headings:
+            level = heading['level']
+            indent = "  " * (int(level) if level.isdigit() else 1)
+            yield f"{indent}• {heading['text']}"
     
-    return "\n".join(output)
+    return "\n".join(lines())
 
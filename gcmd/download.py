@@ -2,48 +2,264 @@
 Download and export functionality for Google Drive files.
 """
 
+import functools
+import hashlib
 import io
+import itertools
+import logging
+import os
+import random
 import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from googleapiclient.http import MediaIoBaseDownload
 from googleapiclient.errors import HttpError
 
-from .client import get_drive_service
+from . import cache
+from .auth import get_authenticated_credentials
+from .client import batch_execute, get_authorized_session, get_drive_service
+from .utils import sanitize_filename
 
+logger = logging.getLogger(__name__)
 
-def get_file_metadata(file_id: str, detailed: bool = False) -> dict:
+
+def _chunk_size_from_env(default: int = 8 * 1024 * 1024) -> int:
+    """Read the download chunk size from GCMD_CHUNK_SIZE, if set to a positive integer."""
+    value = os.environ.get("GCMD_CHUNK_SIZE")
+    try:
+        size = int(value) if value else default
+    except ValueError:
+        return default
+    return size if size > 0 else default
+
+
+# Bytes fetched per request by streamed and ranged downloads. The library
+# default (100 KB) costs about ten HTTP round trips per megabyte.
+DOWNLOAD_CHUNK_SIZE = _chunk_size_from_env()
+
+# Minimum change in percent between progress messages
+PROGRESS_STEP = 5
+
+
+def _report_progress(percent: int, last_reported: int) -> int:
+    """
+    Print download progress to stderr if it advanced enough since the last report.
+    
+    Args:
+        percent: Current progress in percent
+        last_reported: Percent printed last time (-1 if nothing yet)
+        
+    Returns:
+        The percent that has now been reported
+    """
+    if percent - last_reported >= PROGRESS_STEP or (percent == 100 and last_reported != 100):
+        print(f"Download progress: {percent}%", file=sys.stderr)
+        return percent
+    return last_reported
+
+
+class _RawSink:
+    """
+    Write-only file for MediaIoBaseDownload that writes straight to the fd.
+    
+    MediaIoBaseDownload only needs write(), so the io.FileIO layer is skipped
+    and each chunk goes to the file with os.write.
+    """
+    
+    def __init__(self, path: Path):
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+        self.fd = os.open(str(path), flags, 0o644)
+        # Hint that the file is written front to back. This is only a hint,
+        # and pipes and FIFOs (e.g. -o /dev/stdout) reject it with ESPIPE.
+        if hasattr(os, "posix_fadvise"):
+            try:
+                os.posix_fadvise(self.fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+    
+    def write(self, data: bytes) -> int:
+        # os.write may write less than asked for, so keep going until done
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self.fd, view):]
+        return len(data)
+    
+    def tell(self) -> int:
+        return os.lseek(self.fd, 0, os.SEEK_CUR)
+    
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+# Fields requested by get_file_metadata
+FILE_FIELDS = "id,name,mimeType,size,createdTime,modifiedTime,webViewLink"
+# Fields needed to tell whether a local copy of a file is up to date
+CHECKSUM_FILE_FIELDS = FILE_FIELDS + ",md5Checksum"
+DETAILED_FILE_FIELDS = (
+    FILE_FIELDS
+    + ",owners,lastModifyingUser,sharingUser,permissions,shared,description,starred,trashed,parents,version,viewedByMeTime,capabilities"
+)
+
+
+# Maximum number of (file_id, fields) entries kept by the metadata cache
+_METADATA_CACHE_SIZE = 1024
+
+# File metadata already fetched in this process, least recently used first
+_metadata_cache: "OrderedDict[Tuple[str, str], dict]" = OrderedDict()
+_metadata_cache_lock = threading.Lock()
+
+
+def _get_cached_metadata(file_id: str, fields: str) -> Optional[dict]:
+    """Get metadata from the cache, or None if it isn't cached."""
+    key = (file_id, fields)
+    with _metadata_cache_lock:
+        metadata = _metadata_cache.get(key)
+        if metadata is not None:
+            _metadata_cache.move_to_end(key)
+        return metadata
+
+
+def _cache_metadata(file_id: str, fields: str, metadata: dict) -> None:
+    """Add metadata to the cache, evicting the least recently used entry if full."""
+    with _metadata_cache_lock:
+        _metadata_cache[(file_id, fields)] = metadata
+        _metadata_cache.move_to_end((file_id, fields))
+        if len(_metadata_cache) > _METADATA_CACHE_SIZE:
+            _metadata_cache.popitem(last=False)
+
+
+def get_file_metadata(
+    file_id: str,
+    detailed: bool = False,
+    fields: Optional[str] = None,
+    cached: bool = True,
+) -> dict:
     """
     Get metadata for a file.
     
+    Results are cached per (file_id, fields) for the lifetime of the process,
+    and on disk for GCMD_CACHE_TTL seconds across invocations, so resolving
+    the same file again doesn't cost another round trip.
+    
     Args:
         file_id: Google Drive file ID
         detailed: If True, fetch additional metadata (permissions, owners, etc.)
+        fields: Explicit fields mask to request. Overrides `detailed` when given.
+        cached: If False, skip the caches and ask the API. Used when the
+            metadata decides what gets downloaded, since the on-disk cache
+            can be up to GCMD_CACHE_TTL seconds stale. The result is still
+            cached for later lookups.
         
     Returns:
         dict: File metadata
     """
+    if fields is None:
+        fields = DETAILED_FILE_FIELDS if detailed else FILE_FIELDS
+    
+    if cached:
+        file_metadata = _get_cached_metadata(file_id, fields)
+        if file_metadata is not None:
+            return file_metadata
+        
+        # Then the on-disk cache shared with earlier invocations
+        file_metadata = cache.get_metadata(file_id, fields)
+        if file_metadata is not None:
+            _cache_metadata(file_id, fields, file_metadata)
+            return file_metadata
+    
     service = get_drive_service()
     try:
-        # Basic fields
-        fields = "id,name,mimeType,size,createdTime,modifiedTime,webViewLink"
-        
-        # Add detailed fields if requested
-        if detailed:
-            fields += ",owners,lastModifyingUser,sharingUser,permissions,shared,description,starred,trashed,parents,version,viewedByMeTime,capabilities"
-        
         file_metadata = service.files().get(
             fileId=file_id,
             fields=fields,
             supportsAllDrives=True
         ).execute()
-        return file_metadata
     except HttpError as e:
         raise Exception(f"Failed to get file metadata: {e}")
+    
+    _cache_metadata(file_id, fields, file_metadata)
+    cache.put_metadata(file_id, fields, file_metadata)
+    return file_metadata
 
 
-def export_google_doc_as_markdown(file_id: str, output_path: Optional[str] = None, use_title: bool = True) -> str:
+def get_files_metadata_bulk(
+    file_ids: List[str],
+    detailed: bool = False,
+    fields: Optional[str] = None,
+    cached: bool = True,
+) -> Dict[str, Union[dict, Exception]]:
+    """
+    Get metadata for several files using batch requests.
+    
+    Files that are already cached are not requested again, and the fetched
+    metadata is added to the cache, so later get_file_metadata calls for the
+    same files are free. A file that can't be fetched (e.g. a 404) doesn't
+    fail the others; its entry is the exception instead.
+    
+    Args:
+        file_ids: Google Drive file IDs
+        detailed: If True, fetch additional metadata (permissions, owners, etc.)
+        fields: Explicit fields mask to request. Overrides `detailed` when given.
+        cached: If False, skip the caches and ask the API, as for
+            get_file_metadata
+        
+    Returns:
+        Dictionary mapping each file ID to its metadata, or to the Exception
+        its lookup failed with
+    """
+    if fields is None:
+        fields = DETAILED_FILE_FIELDS if detailed else FILE_FIELDS
+    
+    metadata_by_id = {}
+    missing = []
+    for file_id in dict.fromkeys(file_ids):
+        if not cached:
+            missing.append(file_id)
+            continue
+        file_metadata = _get_cached_metadata(file_id, fields)
+        if file_metadata is None:
+            file_metadata = cache.get_metadata(file_id, fields)
+            if file_metadata is not None:
+                _cache_metadata(file_id, fields, file_metadata)
+        if file_metadata is not None:
+            metadata_by_id[file_id] = file_metadata
+        else:
+            missing.append(file_id)
+    
+    if missing:
+        service = get_drive_service()
+        calls = [
+            service.files().get(fileId=file_id, fields=fields, supportsAllDrives=True)
+            for file_id in missing
+        ]
+        for file_id, result in zip(missing, batch_execute(service, calls)):
+            if isinstance(result, HttpError):
+                metadata_by_id[file_id] = Exception(f"Failed to get file metadata for {file_id}: {result}")
+                continue
+            _cache_metadata(file_id, fields, result)
+            cache.put_metadata(file_id, fields, result)
+            metadata_by_id[file_id] = result
+    
+    return {file_id: metadata_by_id[file_id] for file_id in file_ids}
+
+
+def clear_file_metadata_cache() -> None:
+    """Forget all file metadata cached by get_file_metadata."""
+    with _metadata_cache_lock:
+        _metadata_cache.clear()
+
+
+def export_google_doc_as_markdown(
+    file_id: str,
+    output_path: Optional[str] = None,
+    use_title: bool = True,
+    metadata: Optional[dict] = None,
+) -> str:
     """
     Export a Google Doc as markdown.
     
@@ -51,6 +267,8 @@ def export_google_doc_as_markdown(file_id: str, output_path: Optional[str] = Non
         file_id: Google Drive file ID
         output_path: Optional output file path. If not provided and use_title=True, uses document title.
         use_title: If True and output_path is None, use document title as filename in current directory.
+        metadata: Previously fetched file metadata (must include name and mimeType).
+            If not provided, it is fetched from the API.
         
     Returns:
         str: Path to the downloaded file or "stdout" if printed
@@ -59,7 +277,8 @@ def export_google_doc_as_markdown(file_id: str, output_path: Optional[str] = Non
     
     try:
         # First, get file metadata to get the name
-        metadata = get_file_metadata(file_id)
+        if metadata is None:
+            metadata = get_file_metadata(file_id)
         file_name = metadata.get("name", "document")
         mime_type = metadata.get("mimeType", "")
         
@@ -69,27 +288,8 @@ def export_google_doc_as_markdown(file_id: str, output_path: Optional[str] = Non
                 f"Use the 'download' command for other file types."
             )
         
-        # Export as markdown using Google's native markdown export
-        request = service.files().export_media(
-            fileId=file_id,
-            mimeType="text/markdown"
-        )
-        
-        # Download the content
-        fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
-            if status:
-                print(f"Download progress: {int(status.progress() * 100)}%", file=sys.stderr)
-        
-        # Get the content
-        content = fh.getvalue().decode("utf-8")
-
         # Sanitize filename to avoid path traversal issues
-        import re
-        safe_filename = re.sub(r'[<>:"/\\|?*]', '_', file_name)
+        safe_filename = sanitize_filename(file_name)
 
         # Determine output path
         if output_path:
@@ -104,24 +304,277 @@ def export_google_doc_as_markdown(file_id: str, output_path: Optional[str] = Non
             output_file = Path(f"{safe_filename}.exported.md")
         else:
             # Print to stdout
-            print(content)
+            output_file = None
+        
+        # Export as markdown using Google's native markdown export
+        request = service.files().export_media(
+            fileId=file_id,
+            mimeType="text/markdown"
+        )
+        
+        # Stream the content to a temporary file next to the output file and
+        # rename it into place once complete, so a failed export never
+        # clobbers an earlier one; only stdout output needs the whole
+        # document in memory
+        if output_file is not None:
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = output_file.with_name(output_file.name + ".tmp")
+            fh = _RawSink(tmp_file)
+        else:
+            fh = io.BytesIO()
+        
+        try:
+            downloader = MediaIoBaseDownload(fh, request, chunksize=DOWNLOAD_CHUNK_SIZE)
+            done = False
+            reported = -1
+            while not done:
+                status, done = downloader.next_chunk()
+                if status:
+                    reported = _report_progress(int(status.progress() * 100), reported)
+        except BaseException:
+            # Don't leave a partial export behind
+            if output_file is not None:
+                fh.close()
+                tmp_file.unlink(missing_ok=True)
+            raise
+        
+        if output_file is None:
+            out = getattr(sys.stdout, "buffer", None)
+            if out is None:
+                # stdout has been replaced by a text-only stream
+                print(fh.getvalue().decode("utf-8"))
+                return "stdout"
+            # Write the exported UTF-8 bytes as-is rather than decoding them
+            # to str only for print() to encode them again
+            sys.stdout.flush()
+            out.write(fh.getbuffer())
+            out.write(b"\n")
+            out.flush()
             return "stdout"
         
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        output_file.write_text(content)
+        fh.close()
+        os.replace(tmp_file, output_file)
         return str(output_file)
             
     except HttpError as e:
         raise Exception(f"Failed to export document: {e}")
 
 
-def download_file(file_id: str, output_path: Optional[str] = None) -> str:
+# Files at least this large are downloaded as parallel byte ranges
+RANGE_DOWNLOAD_THRESHOLD = 64 * 1024 * 1024
+
+# download_many schedules files at least this large on its low-concurrency pool
+LARGE_FILE_THRESHOLD = 8 * 1024 * 1024
+
+# Seconds to wait for the media server before giving up on a range request
+_RANGE_TIMEOUT = 60
+
+
+class _SizeMismatch(Exception):
+    """The server reports a different file size than the metadata did."""
+
+
+def _parallel_range_download(
+    file_id: str,
+    size: int,
+    output_file: Path,
+    chunks: int = 8,
+    chunk_size: int = 8 * 1024 * 1024,
+    show_progress: bool = True,
+) -> bool:
+    """
+    Download a file's content as byte ranges fetched over several connections.
+    
+    A single media stream is limited to one connection's throughput, so large
+    files are split into chunk_size ranges fetched concurrently and written
+    into place with pwrite.
+    
+    Args:
+        file_id: Google Drive file ID
+        size: File size in bytes, from its metadata
+        output_file: Path to write the file to; it's removed if the download
+            fails, so this should be a temporary file
+        chunks: Number of ranges to fetch at once
+        chunk_size: Size in bytes of each range
+        show_progress: Print download progress to stderr
+        
+    Returns:
+        True if the file was downloaded, or False if the server doesn't
+        serve byte ranges for it or the file's size has changed, in which
+        case output_file is removed
+    """
+    session = get_authorized_session()
+    url = f"https://www.googleapis.com/drive/v3/files/{file_id}"
+    params = {"alt": "media", "supportsAllDrives": "true"}
+    
+    def fetch(start: int) -> bytes:
+        end = min(start + chunk_size, size) - 1
+        # Stream the body so that a server ignoring the range header (a 200
+        # with the whole file) is rejected before any of it is read
+        response = session.get(
+            url,
+            params=params,
+            # Ask for the stored bytes; offsets into compressed content would be wrong
+            headers={"range": f"bytes={start}-{end}", "accept-encoding": "identity"},
+            timeout=_RANGE_TIMEOUT,
+            stream=True,
+        )
+        try:
+            if response.status_code != 206:
+                raise Exception(f"Failed to download file: HTTP {response.status_code}")
+            # The size comes from metadata; if the file has changed since, the
+            # ranges no longer cover it
+            total = response.headers.get("content-range", "").rpartition("/")[2]
+            if total != str(size):
+                raise _SizeMismatch(
+                    f"Remote file is {total or 'unknown'} bytes, expected {size}"
+                )
+            content = response.content
+        finally:
+            response.close()
+        if len(content) != end - start + 1:
+            raise Exception(
+                f"Failed to download file: expected {end - start + 1} bytes "
+                f"at offset {start}, got {len(content)}"
+            )
+        return content
+    
+    # Fetch the first range on its own to check that ranges are supported
+    try:
+        first = fetch(0)
+    except Exception:
+        return False
+    
+    fd = os.open(str(output_file), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        # Reserve the whole file up front so ranges can land in any order
+        if hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fd, 0, size)
+            except OSError:
+                os.ftruncate(fd, size)
+        else:
+            os.ftruncate(fd, size)
+        os.pwrite(fd, first, 0)
+        
+        ranges = range(chunk_size, size, chunk_size)
+        offsets = iter(ranges)
+        total = len(ranges) + 1
+        done = 1
+        reported = -1
+        # Keep at most two ranges per worker in flight, so finished ranges
+        # waiting to be written never add up to more than a few chunks
+        window = 2 * chunks
+        with ThreadPoolExecutor(max_workers=chunks) as executor:
+            pending = {}
+            for offset in itertools.islice(offsets, window):
+                pending[executor.submit(fetch, offset)] = offset
+            try:
+                while pending:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        # Drop the future as soon as its bytes are written
+                        os.pwrite(fd, future.result(), pending.pop(future))
+                        done += 1
+                        if show_progress:
+                            reported = _report_progress(int(done / total * 100), reported)
+                    for offset in itertools.islice(offsets, len(finished)):
+                        pending[executor.submit(fetch, offset)] = offset
+            except BaseException:
+                # Don't fetch queued ranges of a download that has failed
+                for future in pending:
+                    future.cancel()
+                raise
+    except _SizeMismatch as e:
+        # Let the caller stream the file, which doesn't depend on its size
+        logger.info("%s; downloading as a single stream", e)
+        os.close(fd)
+        output_file.unlink(missing_ok=True)
+        return False
+    except BaseException:
+        os.close(fd)
+        output_file.unlink(missing_ok=True)
+        raise
+    
+    os.close(fd)
+    return True
+
+
+# Read size used when hashing local files
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _is_unchanged(path: Path, metadata: dict) -> bool:
+    """
+    Check whether a local file already holds the content described by metadata.
+    
+    Args:
+        path: Local file path
+        metadata: Drive file metadata including size and md5Checksum
+        
+    Returns:
+        True if the file exists with the same size and MD5 checksum
+    """
+    expected = metadata.get("md5Checksum")
+    size = metadata.get("size")
+    if not expected or size is None:
+        return False
+    try:
+        # Compare sizes first so mismatched files are never hashed
+        if path.stat().st_size != int(size):
+            return False
+        digest = hashlib.md5()
+        with open(path, "rb") as f:
+            while chunk := f.read(_HASH_CHUNK_SIZE):
+                digest.update(chunk)
+    except OSError:
+        return False
+    return digest.hexdigest() == expected
+
+
+def _download_path(metadata: dict, output_path: Optional[str] = None) -> Path:
+    """Get the local path download_file writes a file to."""
+    # Sanitize filename to avoid path traversal issues
+    safe_filename = sanitize_filename(metadata.get("name", "file"))
+    if output_path:
+        output_file = Path(output_path).expanduser()
+        if output_file.is_dir():
+            output_file = output_file / safe_filename
+        return output_file
+    return Path(safe_filename)
+
+
+def find_unchanged_copy(metadata: dict, output_path: Optional[str] = None) -> Optional[str]:
+    """
+    Find an up-to-date local copy of a file where download_file would write it.
+    
+    Args:
+        metadata: File metadata fetched with CHECKSUM_FILE_FIELDS
+        output_path: Output path as it would be passed to download_file
+        
+    Returns:
+        The local file's path if it has the same size and MD5 checksum as the
+        file in Drive, otherwise None
+    """
+    output_file = _download_path(metadata, output_path)
+    return str(output_file) if _is_unchanged(output_file, metadata) else None
+
+
+def download_file(
+    file_id: str,
+    output_path: Optional[str] = None,
+    metadata: Optional[dict] = None,
+    show_progress: bool = True,
+) -> str:
     """
     Download a non-Google Doc file.
     
     Args:
         file_id: Google Drive file ID
         output_path: Optional output file path. If not provided, uses the file's name.
+        metadata: Previously fetched file metadata (must include name and mimeType).
+            If not provided, it is fetched from the API.
+        show_progress: Print download progress to stderr
         
     Returns:
         str: Path to the downloaded file
@@ -130,8 +583,10 @@ def download_file(file_id: str, output_path: Optional[str] = None) -> str:
     
     try:
         # Get file metadata
-        metadata = get_file_metadata(file_id)
-        file_name = metadata.get("name", "file")
+        if metadata is None:
+            # The size decides how the file is fetched, so don't trust a
+            # possibly stale cached copy
+            metadata = get_file_metadata(file_id, cached=False)
         mime_type = metadata.get("mimeType", "")
         
         # Google Docs, Sheets, Slides need to be exported, not downloaded
@@ -141,34 +596,269 @@ def download_file(file_id: str, output_path: Optional[str] = None) -> str:
                 f"Use 'export' command with appropriate format."
             )
 
-        # Sanitize filename to avoid path traversal issues
-        import re
-        safe_filename = re.sub(r'[<>:"/\\|?*]', '_', file_name)
-
         # Download the file
         request = service.files().get_media(fileId=file_id)
 
         # Determine output path
-        if output_path:
-            output_file = Path(output_path).expanduser()
-            if output_file.is_dir():
-                output_file = output_file / safe_filename
-        else:
-            output_file = Path(safe_filename)
+        output_file = _download_path(metadata, output_path)
         
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        fh = io.FileIO(str(output_file), "wb")
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
-            if status:
-                print(f"Download progress: {int(status.progress() * 100)}%", file=sys.stderr)
+        # Download into a temporary file next to the output file and rename it
+        # into place once complete, so a failed download never clobbers an
+        # earlier copy. Special files such as /dev/stdout or a FIFO can't be
+        # replaced, so they are written directly.
+        direct = output_file.exists() and not output_file.is_file()
+        target = output_file if direct else output_file.with_name(output_file.name + ".tmp")
+        
+        # Large files are fetched as parallel byte ranges where the platform
+        # has pwrite, falling back to a single stream if ranges aren't served
+        size = int(metadata.get("size") or 0)
+        if size >= RANGE_DOWNLOAD_THRESHOLD and hasattr(os, "pwrite") and not direct:
+            if _parallel_range_download(
+                file_id,
+                size,
+                target,
+                chunk_size=DOWNLOAD_CHUNK_SIZE,
+                show_progress=show_progress,
+            ):
+                os.replace(target, output_file)
+                return str(output_file)
+        
+        fh = _RawSink(target)
+        try:
+            downloader = MediaIoBaseDownload(fh, request, chunksize=DOWNLOAD_CHUNK_SIZE)
+            done = False
+            reported = -1
+            while not done:
+                status, done = downloader.next_chunk()
+                if status and show_progress:
+                    reported = _report_progress(int(status.progress() * 100), reported)
+        except BaseException:
+            # Don't leak the fd or leave a partial download behind
+            fh.close()
+            if not direct:
+                target.unlink(missing_ok=True)
+            raise
         
         fh.close()
+        if not direct:
+            os.replace(target, output_file)
         return str(output_file)
         
     except HttpError as e:
         raise Exception(f"Failed to download file: {e}")
 
+
+class _RateLimiter:
+    """Spaces out calls so no more than `rate` start per second, across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.next_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _is_rate_limit_error(error: BaseException) -> bool:
+    """Check whether an error (or the HttpError it wraps) is a Drive rate limit."""
+    while error is not None:
+        if isinstance(error, HttpError):
+            status = error.resp.status
+            return status == 429 or (status == 403 and b"ateLimitExceeded" in (error.content or b""))
+        error = error.__context__
+    return False
+
+
+def _unique_destinations(output_dir: Path, metadata_by_id: Dict[str, dict]) -> Dict[str, Path]:
+    """
+    Pick a distinct output path in output_dir for each file.
+    
+    The first file with a given name keeps it; later ones get a numbered
+    name, e.g. "report (1).pdf". Names are compared case-insensitively, since
+    they would collide on case-insensitive filesystems.
+    
+    Args:
+        output_dir: Directory the files are downloaded into
+        metadata_by_id: Metadata of each file, in download order
+        
+    Returns:
+        Dictionary mapping each file ID to its output path
+    """
+    names = {file_id: _download_path(metadata).name for file_id, metadata in metadata_by_id.items()}
+    taken = {name.casefold() for name in names.values()}
+    seen = set()
+    destinations = {}
+    for file_id, name in names.items():
+        if name.casefold() in seen:
+            stem, suffix = Path(name).stem, Path(name).suffix
+            counter = 1
+            while f"{stem} ({counter}){suffix}".casefold() in taken:
+                counter += 1
+            name = f"{stem} ({counter}){suffix}"
+            taken.add(name.casefold())
+        seen.add(name.casefold())
+        destinations[file_id] = output_dir / name
+    return destinations
+
+
+def download_many(
+    file_ids: List[str],
+    output_dir: str = ".",
+    max_workers: int = 24,
+    large_workers: int = 2,
+    max_qps: float = 10.0,
+    max_retries: int = 5,
+    skip_unchanged: bool = False,
+) -> Dict[str, Optional[str]]:
+    """
+    Download several files concurrently.
+    
+    Metadata for all files is fetched up front in batches and used to split
+    the files by size. Files the batch couldn't get are looked up one by
+    one, and files whose metadata can't be fetched at all are reported as
+    failed without being downloaded. Small files are latency-bound, so many
+    of them are downloaded at once (max_workers). Large files are
+    bandwidth-bound, so only a few run at once (large_workers), each of them
+    fetched as parallel byte ranges when big enough. With the defaults this stays around 40
+    connections in flight. Each worker thread has its own Drive service
+    (httplib2 isn't thread-safe). Downloads are started at no more than
+    max_qps per second, and a file that hits Drive's rate limit is retried
+    with exponential backoff and jitter.
+    
+    Args:
+        file_ids: Google Drive file IDs
+        output_dir: Directory to save the files in
+        max_workers: Maximum number of small files to download at once
+        large_workers: Maximum number of large files to download at once
+        max_qps: Maximum number of downloads to start per second
+        max_retries: Maximum attempts per file when rate limited
+        skip_unchanged: Skip files whose local copy already matches by size
+            and MD5 checksum
+        
+    Returns:
+        Dictionary mapping each file ID to the downloaded file's path, or
+        None if it failed. Files with the same name are saved under numbered
+        names (e.g. "report (1).pdf") rather than overwriting each other.
+    """
+    output_path = Path(output_dir).expanduser()
+    output_path.mkdir(parents=True, exist_ok=True)
+    
+    # Resolve credentials in this thread so workers never race to log in
+    get_authenticated_credentials()
+    
+    limiter = _RateLimiter(max_qps)
+    
+    def with_retries(func: Callable[[str], Any], file_id: str) -> Any:
+        """Call func(file_id), retrying with backoff while Drive rate limits it."""
+        for attempt in range(max_retries):
+            limiter.wait()
+            try:
+                return func(file_id)
+            except Exception as e:
+                if attempt == max_retries - 1 or not _is_rate_limit_error(e):
+                    raise
+                wait_time = min(2 ** attempt, 32) + random.uniform(0, 1)
+                logger.info("Rate limited, retrying %s in %.1fs...", file_id, wait_time)
+                time.sleep(wait_time)
+    
+    def download_one(file_id: str) -> str:
+        return download_file(
+            file_id,
+            str(destinations[file_id]),
+            metadata=metadata_by_id[file_id],
+            show_progress=False,
+        )
+    
+    skipped = set()
+    
+    def fetch_one(file_id: str) -> str:
+        if skip_unchanged:
+            existing = find_unchanged_copy(metadata_by_id[file_id], str(destinations[file_id]))
+            if existing is not None:
+                skipped.add(file_id)
+                return existing
+        return with_retries(download_one, file_id)
+    
+    # The checksum is only requested when it's going to be compared
+    fields = CHECKSUM_FILE_FIELDS if skip_unchanged else FILE_FIELDS
+    
+    try:
+        # Sizes and checksums decide what gets downloaded and how, so they
+        # come from the API rather than the on-disk cache
+        prefetched = get_files_metadata_bulk(file_ids, fields=fields, cached=False)
+    except Exception as e:
+        # Fall back to looking up every file on its own
+        logger.warning("Warning: Failed to prefetch file metadata: %s", e)
+        prefetched = {file_id: e for file_id in file_ids}
+    
+    metadata_by_id = {}
+    unresolved = []
+    for file_id, metadata in prefetched.items():
+        if isinstance(metadata, Exception):
+            unresolved.append(file_id)
+        else:
+            metadata_by_id[file_id] = metadata
+    
+    results: Dict[str, Optional[str]] = {}
+    
+    # Look up files the batch couldn't get one by one, so every file is
+    # scheduled by its real size; files that still fail aren't downloaded
+    if unresolved:
+        lookup = functools.partial(get_file_metadata, fields=fields, cached=False)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(with_retries, lookup, file_id): file_id
+                for file_id in unresolved
+            }
+            for future in as_completed(futures):
+                file_id = futures[future]
+                try:
+                    metadata_by_id[file_id] = future.result()
+                except Exception as e:
+                    results[file_id] = None
+                    logger.warning("Warning: Failed to download %s: %s", file_id, e)
+    
+    # Drive file names aren't unique, so give files that would land on the
+    # same path distinct names instead of letting them overwrite each other
+    in_order = {
+        file_id: metadata_by_id[file_id]
+        for file_id in dict.fromkeys(file_ids)
+        if file_id in metadata_by_id
+    }
+    destinations = _unique_destinations(output_path, in_order)
+    
+    small, large = [], []
+    for file_id in destinations:
+        size = int(metadata_by_id[file_id].get("size") or 0)
+        (large if size >= LARGE_FILE_THRESHOLD else small).append(file_id)
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as small_executor, \
+            ThreadPoolExecutor(max_workers=large_workers) as large_executor:
+        futures = {}
+        # Start the large files first, since they take the longest
+        for file_id in large:
+            futures[large_executor.submit(fetch_one, file_id)] = file_id
+        for file_id in small:
+            futures[small_executor.submit(fetch_one, file_id)] = file_id
+        
+        for done, future in enumerate(as_completed(futures), 1):
+            file_id = futures[future]
+            try:
+                results[file_id] = future.result()
+                if file_id in skipped:
+                    logger.info("Skipped %d/%d: %s (unchanged)", done, len(futures), results[file_id])
+                else:
+                    logger.info("Downloaded %d/%d: %s", done, len(futures), results[file_id])
+            except Exception as e:
+                results[file_id] = None
+                logger.warning("Warning: Failed to download %s: %s", file_id, e)
+    
+    return {file_id: results[file_id] for file_id in file_ids}
@@ -2,34 +2,62 @@
 List and search functionality for Google Drive files.
 """
 
-from typing import Optional, List, Dict
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional, List, Dict, Sequence, Union
 from googleapiclient.errors import HttpError
 
+from . import cache
 from .client import get_drive_service
 
 
-def list_files(
+# Fields requested by list_files: just what the compact listing shows, or
+# everything the verbose listing shows
+LIST_FIELDS = "nextPageToken,files(id,name,mimeType)"
+DETAILED_LIST_FIELDS = (
+    "nextPageToken,files(id,name,mimeType,size,createdTime,modifiedTime,webViewLink,owners)"
+)
+
+# Largest page size files.list accepts
+_MAX_PAGE_SIZE = 1000
+
+
+def _escape(value: str) -> str:
+    """Escape a string for use inside a single-quoted Drive query literal."""
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def iter_files(
     query: Optional[str] = None,
-    mime_type: Optional[str] = None,
+    mime_type: Union[str, Sequence[str], None] = None,
     max_results: int = 20,
     order_by: str = "modifiedTime desc",
     include_trashed: bool = False,
-) -> List[Dict]:
+    fields: Optional[str] = None,
+    verbose: bool = False,
+) -> Iterator[Dict]:
     """
-    List files from Google Drive with optional filters.
+    Iterate over files from Google Drive with optional filters, a page at a time.
+    
+    While the caller works through one page, the next is already being
+    fetched in a background thread (at most one page ahead), so network
+    time overlaps with processing. A caller that stops early doesn't pay
+    for more than that one extra page.
     
     Args:
         query: Search query string (searches name and full text)
-        mime_type: Filter by MIME type
+        mime_type: Filter by MIME type, or by any of several MIME types
         max_results: Maximum number of results to return
         order_by: Sort order (e.g., "modifiedTime desc", "name", "createdTime desc")
         include_trashed: Include trashed files
+        fields: Explicit fields mask to request. Must include nextPageToken
+            for results beyond the first page. Overrides `verbose` when given.
+        verbose: If True, request the fields shown by the verbose listing
+            (size, times, owners, link) instead of just id, name and type
         
-    Returns:
-        List of file dictionaries with metadata
+    Yields:
+        File dictionaries with metadata
     """
-    service = get_drive_service()
-    
     # Build the query
     query_parts = []
     
@@ -38,28 +66,109 @@ def list_files(
     
     if query:
         # Search in name and full text
+        query = _escape(query)
         query_parts.append(f"(name contains '{query}' or fullText contains '{query}')")
     
     if mime_type:
-        query_parts.append(f"mimeType = '{mime_type}'")
+        mime_types = [mime_type] if isinstance(mime_type, str) else list(mime_type)
+        query_parts.append(
+            "(" + " or ".join(f"mimeType = '{_escape(m)}'" for m in mime_types) + ")"
+        )
     
     q = " and ".join(query_parts) if query_parts else None
     
-    try:
-        results = service.files().list(
+    if fields is None:
+        fields = DETAILED_LIST_FIELDS if verbose else LIST_FIELDS
+    
+    def fetch_page(page_token: Optional[str], page_size: int) -> Dict:
+        # Runs on the prefetch thread, which gets its own Drive service
+        return get_drive_service().files().list(
             q=q,
-            pageSize=max_results,
+            pageSize=page_size,
+            pageToken=page_token,
             orderBy=order_by,
-            fields="files(id,name,mimeType,size,createdTime,modifiedTime,webViewLink,owners)",
+            fields=fields,
             supportsAllDrives=True,
             includeItemsFromAllDrives=True
         ).execute()
-        
-        files = results.get("files", [])
-        return files
+    
+    if max_results <= 0:
+        return
+    
+    remaining = max_results
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        # Don't ask for more than is still needed
+        future = executor.submit(fetch_page, None, min(remaining, _MAX_PAGE_SIZE))
+        while future is not None:
+            results = future.result()
+            
+            files = results.get("files", [])[:remaining]
+            remaining -= len(files)
+            
+            # Start fetching the next page before handing this one over
+            page_token = results.get("nextPageToken")
+            future = None
+            if remaining > 0 and page_token:
+                future = executor.submit(fetch_page, page_token, min(remaining, _MAX_PAGE_SIZE))
+            
+            yield from files
         
     except HttpError as e:
         raise Exception(f"Failed to list files: {e}")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def list_files(
+    query: Optional[str] = None,
+    mime_type: Union[str, Sequence[str], None] = None,
+    max_results: int = 20,
+    order_by: str = "modifiedTime desc",
+    include_trashed: bool = False,
+    fields: Optional[str] = None,
+    verbose: bool = False,
+) -> List[Dict]:
+    """
+    List files from Google Drive with optional filters.
+    
+    Follows result pages until max_results files have been returned.
+    Listings are cached on disk for GCMD_CACHE_TTL seconds, so repeating the
+    same listing shortly after doesn't call the API again.
+    
+    Args:
+        query: Search query string (searches name and full text)
+        mime_type: Filter by MIME type, or by any of several MIME types
+        max_results: Maximum number of results to return
+        order_by: Sort order (e.g., "modifiedTime desc", "name", "createdTime desc")
+        include_trashed: Include trashed files
+        fields: Explicit fields mask to request. Must include nextPageToken
+            for results beyond the first page. Overrides `verbose` when given.
+        verbose: If True, request the fields shown by the verbose listing
+            (size, times, owners, link) instead of just id, name and type
+        
+    Returns:
+        List of file dictionaries with metadata
+    """
+    if fields is None:
+        fields = DETAILED_LIST_FIELDS if verbose else LIST_FIELDS
+    mime_types = [mime_type] if isinstance(mime_type, str) else list(mime_type or [])
+    cache_key = (query, mime_types, max_results, order_by, include_trashed, fields)
+    
+    files = cache.get_listing(*cache_key)
+    if files is not None:
+        return files
+    
+    files = list(iter_files(
+        query=query,
+        mime_type=mime_type,
+        max_results=max_results,
+        order_by=order_by,
+        include_trashed=include_trashed,
+        fields=fields,
+    ))
+    cache.put_listing(files, *cache_key)
+    return files
 
 
 def search_files(query: str, max_results: int = 20) -> List[Dict]:
@@ -108,6 +217,25 @@ def list_google_sheets(max_results: int = 20) -> List[Dict]:
     )
 
 
+def list_docs_and_sheets(max_results: int = 20) -> List[Dict]:
+    """
+    List Google Docs and Google Sheets together, in a single query.
+    
+    Args:
+        max_results: Maximum number of results
+        
+    Returns:
+        List of Google Docs and Sheets
+    """
+    return list_files(
+        mime_type=[
+            "application/vnd.google-apps.document",
+            "application/vnd.google-apps.spreadsheet",
+        ],
+        max_results=max_results
+    )
+
+
 def list_folders(max_results: int = 20) -> List[Dict]:
     """
     List only folders.
@@ -124,6 +252,33 @@ def list_folders(max_results: int = 20) -> List[Dict]:
     )
 
 
+# Output templates for format_file_list
+_TERSE_TEMPLATE = "[{type:12}] {id:44} {name}"
+_VERBOSE_TEMPLATE = (
+    "[{type}] {name}\n"
+    "  ID: {id}\n"
+    "  Modified: {modified}{size}\n"
+    "  Owner: {owner}\n"
+)
+
+_GOOGLE_APPS_PREFIX = "application/vnd.google-apps."
+
+
+@functools.lru_cache(maxsize=256)
+def _simplify_mime_type(mime_type: str) -> str:
+    """
+    Shorten a MIME type for display (e.g. "Document", "PDF").
+
+    A Drive only holds a handful of distinct MIME types, so results are
+    cached and long listings mostly skip the string parsing.
+    """
+    if mime_type.startswith(_GOOGLE_APPS_PREFIX):
+        return mime_type.rpartition(".")[2].title()
+    if "/" in mime_type:
+        return mime_type.rpartition("/")[2].upper()
+    return mime_type
+
+
 def format_file_list(files: List[Dict], verbose: bool = False) -> str:
     """
     Format file list for display.
@@ -138,38 +293,27 @@ def format_file_list(files: List[Dict], verbose: bool = False) -> str:
     if not files:
         return "No files found."
     
+    if not verbose:
+        return "\n".join(
+            _TERSE_TEMPLATE.format_map({
+                "type": _simplify_mime_type(file.get("mimeType", "")),
+                "id": file.get("id", ""),
+                "name": file.get("name", "Untitled"),
+            })
+            for file in files
+        )
+    
     output = []
     for file in files:
-        file_id = file.get("id", "")
-        name = file.get("name", "Untitled")
-        mime_type = file.get("mimeType", "")
-        
-        # Simplify MIME type display
-        type_display = mime_type
-        if mime_type.startswith("application/vnd.google-apps."):
-            type_display = mime_type.split(".")[-1].title()
-        elif "/" in mime_type:
-            type_display = mime_type.split("/")[-1].upper()
-        
-        if verbose:
-            size = file.get("size")
-            size_display = ""
-            if size:
-                size_mb = int(size) / (1024 * 1024)
-                size_display = f" ({size_mb:.2f} MB)"
-            
-            modified = file.get("modifiedTime", "")
-            owners = file.get("owners", [])
-            owner_name = owners[0].get("displayName", "") if owners else ""
-            
-            output.append(
-                f"[{type_display}] {name}\n"
-                f"  ID: {file_id}\n"
-                f"  Modified: {modified}{size_display}\n"
-                f"  Owner: {owner_name}\n"
-            )
-        else:
-            output.append(f"[{type_display:12}] {file_id:44} {name}")
+        size = file.get("size")
+        owners = file.get("owners")
+        output.append(_VERBOSE_TEMPLATE.format_map({
+            "type": _simplify_mime_type(file.get("mimeType", "")),
+            "name": file.get("name", "Untitled"),
+            "id": file.get("id", ""),
+            "modified": file.get("modifiedTime", ""),
+            "size": f" ({int(size) / (1024 * 1024):.2f} MB)" if size else "",
+            "owner": owners[0].get("displayName", "") if owners else "",
+        }))
     
     return "\n".join(output)
-
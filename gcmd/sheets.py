@@ -2,22 +2,44 @@
 Google Sheets API functionality for spreadsheet operations.
 """
 
+import functools
 import io
-import re
-import sys
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 
 from googleapiclient.http import MediaIoBaseDownload
 from googleapiclient.errors import HttpError
 
-from .client import get_sheets_service, get_drive_service
+from . import __version__
+from .client import batch_execute, get_authorized_session, get_sheets_service
+from .utils import sanitize_filename
 
+logger = logging.getLogger(__name__)
 
+# Google only gzips responses for clients whose user agent mentions gzip.
+# API calls made through the discovery client already get this; the raw
+# CSV export request needs it set explicitly.
+_EXPORT_HEADERS = {
+    "accept-encoding": "gzip",
+    "user-agent": f"gcmd/{__version__} (gzip)",
+}
+
+# Seconds to wait for the export server before giving up on a request
+_EXPORT_TIMEOUT = 30
+
+# Spreadsheet metadata needed to list and name sheets
+_SPREADSHEET_FIELDS = "spreadsheetId,properties.title,sheets.properties"
+
+
+@functools.lru_cache(maxsize=64)
 def get_spreadsheet_metadata(spreadsheet_id: str) -> Dict:
     """
     Get metadata for a Google Spreadsheet including all sheet names.
 
+    Results are cached for the lifetime of the process.
+
     Args:
         spreadsheet_id: Google Sheets spreadsheet ID
 
@@ -29,24 +51,27 @@ def get_spreadsheet_metadata(spreadsheet_id: str) -> Dict:
     try:
         spreadsheet = service.spreadsheets().get(
             spreadsheetId=spreadsheet_id,
-            fields="spreadsheetId,properties.title,sheets.properties"
+            fields=_SPREADSHEET_FIELDS
         ).execute()
         return spreadsheet
     except HttpError as e:
         raise Exception(f"Failed to get spreadsheet metadata: {e}")
 
 
-def list_sheets(spreadsheet_id: str) -> List[Dict]:
+def list_sheets(spreadsheet_id: str, metadata: Optional[Dict] = None) -> List[Dict]:
     """
     List all sheets (tabs) in a Google Spreadsheet.
 
     Args:
         spreadsheet_id: Google Sheets spreadsheet ID
+        metadata: Previously fetched spreadsheet metadata. If not provided,
+            it is fetched from the API.
 
     Returns:
         List of sheet information dictionaries with sheetId, title, and index
     """
-    metadata = get_spreadsheet_metadata(spreadsheet_id)
+    if metadata is None:
+        metadata = get_spreadsheet_metadata(spreadsheet_id)
 
     sheets = []
     for sheet in metadata.get('sheets', []):
@@ -60,56 +85,166 @@ def list_sheets(spreadsheet_id: str) -> List[Dict]:
     return sorted(sheets, key=lambda x: x['index'])
 
 
-def export_sheet_as_csv(spreadsheet_id: str, sheet_id: int, max_retries: int = 5) -> str:
+def list_sheets_many(spreadsheet_ids: List[str]) -> Dict[str, Union[List[Dict], Exception]]:
     """
-    Export a single sheet from a Google Spreadsheet as CSV.
+    List the sheets in several Google Spreadsheets using batch requests.
+
+    A spreadsheet that can't be fetched (e.g. a 404) doesn't fail the others;
+    its entry is the exception instead.
+
+    Args:
+        spreadsheet_ids: Google Sheets spreadsheet IDs
+
+    Returns:
+        Dictionary mapping each spreadsheet ID to its list of sheets, as
+        returned by list_sheets, or to the Exception its lookup failed with
+    """
+    service = get_sheets_service()
+
+    calls = [
+        service.spreadsheets().get(spreadsheetId=spreadsheet_id, fields=_SPREADSHEET_FIELDS)
+        for spreadsheet_id in spreadsheet_ids
+    ]
+
+    sheets_by_id = {}
+    for spreadsheet_id, result in zip(spreadsheet_ids, batch_execute(service, calls)):
+        if isinstance(result, HttpError):
+            sheets_by_id[spreadsheet_id] = Exception(
+                f"Failed to get spreadsheet metadata for {spreadsheet_id}: {result}"
+            )
+        else:
+            sheets_by_id[spreadsheet_id] = list_sheets(spreadsheet_id, metadata=result)
+
+    return sheets_by_id
+
+
+def _retry_delay(headers, attempt: int) -> float:
+    """
+    Get how long to wait before retrying a rate-limited request.
+
+    Uses the server's Retry-After header when it gives a number of seconds,
+    otherwise falls back to exponential backoff (1, 2, 4, ... seconds, capped
+    at 60).
+
+    Args:
+        headers: Response headers (a case-insensitive mapping, such as a
+            requests response's headers), or None
+        attempt: Zero-based attempt number
+
+    Returns:
+        Delay in seconds
+    """
+    retry_after = headers.get('retry-after') if headers is not None else None
+    if retry_after is not None:
+        try:
+            return max(0, int(retry_after))
+        except ValueError:
+            pass  # HTTP-date form, fall back to exponential backoff
+    return min(2 ** attempt, 60)
+
+
+def _fetch_sheet_csv(
+    spreadsheet_id: str,
+    sheet_id: int,
+    max_retries: int = 5,
+    max_wait: float = 120.0,
+) -> bytes:
+    """
+    Download a single sheet from a Google Spreadsheet as raw CSV bytes.
 
     Args:
         spreadsheet_id: Google Sheets spreadsheet ID
         sheet_id: The sheet's gid (sheet ID)
         max_retries: Maximum number of retry attempts for rate limiting
+        max_wait: Maximum total seconds to spend waiting between retries
 
     Returns:
-        str: CSV content as string
+        bytes: UTF-8 encoded CSV content
     """
     import time
 
-    service = get_drive_service()
-
     # Build the export URL manually
     url = f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv&gid={sheet_id}"
 
     last_error = None
+    waited = 0.0
     for attempt in range(max_retries):
-        try:
-            # Use the Drive API's http property directly
-            http = service._http
-            response, content = http.request(url)
+        response = get_authorized_session().get(url, headers=_EXPORT_HEADERS, timeout=_EXPORT_TIMEOUT)
+
+        if response.status_code == 200:
+            return response.content
+        elif response.status_code == 429:
+            # Rate limited - wait and retry
+            last_error = Exception(f"Rate limited (HTTP 429)")
+            wait_time = _retry_delay(response.headers, attempt)
+        else:
+            raise Exception(f"Failed to export sheet: HTTP {response.status_code}")
+
+        # Don't sleep after the last attempt, or past the total wait budget
+        if attempt == max_retries - 1 or waited + wait_time > max_wait:
+            break
+
+        logger.info("Rate limited, retrying in %ss...", wait_time)
+        time.sleep(wait_time)
+        waited += wait_time
+
+    raise Exception(f"Failed to export sheet as CSV after {attempt + 1} attempts: {last_error}")
+
+
+def export_sheet_as_csv(
+    spreadsheet_id: str,
+    sheet_id: int,
+    max_retries: int = 5,
+    max_wait: float = 120.0,
+) -> str:
+    """
+    Export a single sheet from a Google Spreadsheet as CSV.
+
+    Args:
+        spreadsheet_id: Google Sheets spreadsheet ID
+        sheet_id: The sheet's gid (sheet ID)
+        max_retries: Maximum number of retry attempts for rate limiting
+        max_wait: Maximum total seconds to spend waiting between retries
+
+    Returns:
+        str: CSV content as string
+    """
+    return _fetch_sheet_csv(spreadsheet_id, sheet_id, max_retries, max_wait).decode('utf-8')
+
 
-            if response.status == 200:
-                return content.decode('utf-8')
-            elif response.status == 429:
-                # Rate limited - wait and retry
-                wait_time = 2 ** attempt  # Exponential backoff: 1, 2, 4 seconds
-                print(f"Rate limited, retrying in {wait_time}s...", file=sys.stderr)
-                time.sleep(wait_time)
-                last_error = Exception(f"Rate limited (HTTP 429)")
-            else:
-                raise Exception(f"Failed to export sheet: HTTP {response.status}")
+def export_sheet_to_file(
+    spreadsheet_id: str,
+    sheet_id: int,
+    filepath: Path,
+    max_retries: int = 5,
+    max_wait: float = 120.0,
+) -> Path:
+    """
+    Export a single sheet from a Google Spreadsheet to a CSV file.
 
-        except HttpError as e:
-            last_error = e
-            if attempt < max_retries - 1:
-                time.sleep(2 ** attempt)
+    The CSV is written exactly as received (UTF-8), without decoding it.
+
+    Args:
+        spreadsheet_id: Google Sheets spreadsheet ID
+        sheet_id: The sheet's gid (sheet ID)
+        filepath: Path of the CSV file to write
+        max_retries: Maximum number of retry attempts for rate limiting
+        max_wait: Maximum total seconds to spend waiting between retries
 
-    raise Exception(f"Failed to export sheet as CSV after {max_retries} attempts: {last_error}")
+    Returns:
+        Path: The written file path
+    """
+    content = _fetch_sheet_csv(spreadsheet_id, sheet_id, max_retries, max_wait)
+    filepath.write_bytes(content)
+    return filepath
 
 
 def export_spreadsheet_as_csv(
     spreadsheet_id: str,
     output_dir: Optional[str] = None,
     sheet_names: Optional[List[str]] = None,
-    delay_between_sheets: float = 1.0
+    delay_between_sheets: float = 1.0,
+    concurrency: int = 3,
 ) -> List[str]:
     """
     Export a Google Spreadsheet to CSV files, one per sheet.
@@ -121,7 +256,9 @@ def export_spreadsheet_as_csv(
         spreadsheet_id: Google Sheets spreadsheet ID
         output_dir: Base output directory (default: current directory)
         sheet_names: Optional list of specific sheet names to export (default: all)
-        delay_between_sheets: Delay in seconds between sheet exports to avoid rate limiting
+        delay_between_sheets: Delay in seconds between sheet exports to avoid rate
+            limiting. Only applies when concurrency is 1.
+        concurrency: Number of sheets to export in parallel
 
     Returns:
         List of file paths that were created
@@ -132,7 +269,7 @@ def export_spreadsheet_as_csv(
     spreadsheet_title = metadata.get('properties', {}).get('title', 'spreadsheet')
 
     # Sanitize the spreadsheet title for use as directory name
-    safe_title = re.sub(r'[<>:"/\\|?*]', '_', spreadsheet_title)
+    safe_title = sanitize_filename(spreadsheet_title)
 
     # Create output directory
     base_path = Path(output_dir).expanduser() if output_dir else Path.cwd()
@@ -140,7 +277,7 @@ def export_spreadsheet_as_csv(
     output_path.mkdir(parents=True, exist_ok=True)
 
     # Get all sheets
-    sheets = list_sheets(spreadsheet_id)
+    sheets = list_sheets(spreadsheet_id, metadata=metadata)
 
     # Filter sheets if specific names requested
     if sheet_names:
@@ -148,36 +285,42 @@ def export_spreadsheet_as_csv(
         if not sheets:
             raise Exception(f"No sheets found matching: {sheet_names}")
 
-    exported_files = []
     total_sheets = len(sheets)
+    concurrency = max(1, concurrency)
 
-    for idx, sheet in enumerate(sheets, 1):
+    def export_one(idx: int, sheet: Dict) -> str:
         sheet_title = sheet['title']
-        sheet_id = sheet['sheetId']
 
         # Sanitize sheet title for filename
-        safe_sheet_title = re.sub(r'[<>:"/\\|?*]', '_', sheet_title)
-        filename = f"{safe_sheet_title}.csv"
-        filepath = output_path / filename
+        safe_sheet_title = sanitize_filename(sheet_title)
+        filepath = output_path / f"{safe_sheet_title}.csv"
 
-        # Add delay between sheets to avoid rate limiting (skip first sheet)
-        if idx > 1 and delay_between_sheets > 0:
+        # When exporting serially, add a delay between sheets to avoid rate
+        # limiting (skip first sheet). In parallel, the pool size is the limit.
+        if concurrency == 1 and idx > 1 and delay_between_sheets > 0:
             time.sleep(delay_between_sheets)
 
-        try:
-            print(f"Exporting sheet {idx}/{total_sheets}: {sheet_title}...", file=sys.stderr)
-
-            # Export the sheet
-            content = export_sheet_as_csv(spreadsheet_id, sheet_id)
+        logger.info("Exporting sheet %d/%d: %s...", idx, total_sheets, sheet_title)
 
-            # Write to file
-            filepath.write_text(content, encoding='utf-8')
-            exported_files.append(str(filepath))
+        # Export the sheet straight to file
+        export_sheet_to_file(spreadsheet_id, sheet['sheetId'], filepath)
+        return str(filepath)
 
-        except Exception as e:
-            print(f"Warning: Failed to export sheet '{sheet_title}': {e}", file=sys.stderr)
+    exported = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(export_one, idx, sheet): (idx, sheet)
+            for idx, sheet in enumerate(sheets, 1)
+        }
+        for future in as_completed(futures):
+            idx, sheet = futures[future]
+            try:
+                exported[idx] = future.result()
+            except Exception as e:
+                logger.warning("Warning: Failed to export sheet '%s': %s", sheet['title'], e)
 
-    return exported_files
+    # Return files in sheet order, regardless of completion order
+    return [exported[idx] for idx in sorted(exported)]
 
 
 def format_sheets_output(sheets: List[Dict]) -> str:
@@ -193,8 +336,6 @@ def format_sheets_output(sheets: List[Dict]) -> str:
     if not sheets:
         return "No sheets found."
 
-    output = []
-    for sheet in sheets:
-        output.append(f"  📊 {sheet['title']} (ID: {sheet['sheetId']})")
-
-    return "\n".join(output)
+    return "\n".join(
+        f"  📊 {sheet['title']} (ID: {sheet['sheetId']})" for sheet in sheets
+    )
@@ -2,11 +2,15 @@
 Google Tasks operations module.
 """
 
-from typing import Optional
+import functools
+from typing import Iterator, Optional
 from datetime import datetime
 
 from .client import get_tasks_service
 
+# Section divider used in formatted output
+_DIV = "=" * 70
+
 
 def list_tasks(tasklist_id: str = "@default", max_results: int = 100, show_completed: bool = False, show_hidden: bool = False) -> list[dict]:
     """
@@ -60,24 +64,31 @@ def list_task_lists(max_results: int = 100) -> list[dict]:
     return task_lists
 
 
-def format_task_list(tasks: list[dict], verbose: bool = False) -> str:
+@functools.lru_cache(maxsize=1024)
+def _format_timestamp(value: str) -> str:
     """
-    Format tasks for display.
+    Format an RFC 3339 timestamp from the Tasks API for display.
+
+    Cached, since bulk-updated tasks and lists often share timestamps.
 
     Args:
-        tasks: List of task dictionaries
-        verbose: Show detailed information
+        value: Timestamp string, e.g. "2024-01-15T10:30:00.000Z"
 
     Returns:
-        Formatted string output
+        The timestamp as "YYYY-MM-DD HH:MM", or the original string if it
+        can't be parsed
     """
-    if not tasks:
-        return "No tasks found."
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).strftime('%Y-%m-%d %H:%M')
+    except (AttributeError, TypeError, ValueError):
+        return value
 
-    lines = []
-    lines.append(f"\n{'='*70}")
-    lines.append(f"TASKS ({len(tasks)} total)")
-    lines.append(f"{'='*70}\n")
+
+def _task_list_lines(tasks: list[dict], verbose: bool) -> Iterator[str]:
+    """Yield the output lines for format_task_list."""
+    yield f"\n{_DIV}"
+    yield f"TASKS ({len(tasks)} total)"
+    yield f"{_DIV}\n"
 
     for task in tasks:
         title = task.get("title", "(No title)")
@@ -89,21 +100,17 @@ def format_task_list(tasks: list[dict], verbose: bool = False) -> str:
         else:
             indicator = "○"
 
-        lines.append(f"{indicator} {title}")
+        yield f"{indicator} {title}"
 
         if verbose:
             # Show more details
             task_id = task.get("id", "N/A")
-            lines.append(f"  ID: {task_id}")
+            yield f"  ID: {task_id}"
 
             # Due date
             due = task.get("due")
             if due:
-                try:
-                    due_dt = datetime.fromisoformat(due.replace("Z", "+00:00"))
-                    lines.append(f"  Due: {due_dt.strftime('%Y-%m-%d %H:%M')}")
-                except:
-                    lines.append(f"  Due: {due}")
+                yield f"  Due: {_format_timestamp(due)}"
 
             # Notes
             notes = task.get("notes")
@@ -111,71 +118,76 @@ def format_task_list(tasks: list[dict], verbose: bool = False) -> str:
                 # Truncate long notes
                 if len(notes) > 100:
                     notes = notes[:100] + "..."
-                lines.append(f"  Notes: {notes}")
+                yield f"  Notes: {notes}"
 
             # Completed time
             if status == "completed":
                 completed = task.get("completed")
                 if completed:
-                    try:
-                        completed_dt = datetime.fromisoformat(completed.replace("Z", "+00:00"))
-                        lines.append(f"  Completed: {completed_dt.strftime('%Y-%m-%d %H:%M')}")
-                    except:
-                        lines.append(f"  Completed: {completed}")
+                    yield f"  Completed: {_format_timestamp(completed)}"
 
             # Updated time
             updated = task.get("updated")
             if updated:
-                try:
-                    updated_dt = datetime.fromisoformat(updated.replace("Z", "+00:00"))
-                    lines.append(f"  Updated: {updated_dt.strftime('%Y-%m-%d %H:%M')}")
-                except:
-                    lines.append(f"  Updated: {updated}")
+                yield f"  Updated: {_format_timestamp(updated)}"
 
             # Web link
             self_link = task.get("selfLink")
             if self_link:
-                lines.append(f"  Link: {self_link}")
+                yield f"  Link: {self_link}"
 
-            lines.append("")  # Blank line between tasks
+            yield ""  # Blank line between tasks
 
-    lines.append(f"{'='*70}\n")
-    return "\n".join(lines)
+    yield f"{_DIV}\n"
 
 
-def format_task_lists(task_lists: list[dict]) -> str:
+def format_task_list(tasks: list[dict], verbose: bool = False) -> str:
     """
-    Format task lists for display.
+    Format tasks for display.
 
     Args:
-        task_lists: List of task list dictionaries
+        tasks: List of task dictionaries
+        verbose: Show detailed information
 
     Returns:
         Formatted string output
     """
-    if not task_lists:
-        return "No task lists found."
+    if not tasks:
+        return "No tasks found."
+
+    return "\n".join(_task_list_lines(tasks, verbose))
+
 
-    lines = []
-    lines.append(f"\n{'='*70}")
-    lines.append(f"TASK LISTS ({len(task_lists)} total)")
-    lines.append(f"{'='*70}\n")
+def _task_lists_lines(task_lists: list[dict]) -> Iterator[str]:
+    """Yield the output lines for format_task_lists."""
+    yield f"\n{_DIV}"
+    yield f"TASK LISTS ({len(task_lists)} total)"
+    yield f"{_DIV}\n"
 
     for task_list in task_lists:
         title = task_list.get("title", "(No title)")
         task_list_id = task_list.get("id", "N/A")
         updated = task_list.get("updated", "N/A")
 
-        lines.append(f"📋 {title}")
-        lines.append(f"   ID: {task_list_id}")
+        yield f"📋 {title}"
+        yield f"   ID: {task_list_id}"
+        yield f"   Updated: {_format_timestamp(updated)}"
+        yield ""  # Blank line between lists
+
+    yield f"{_DIV}\n"
+
+
+def format_task_lists(task_lists: list[dict]) -> str:
+    """
+    Format task lists for display.
 
-        try:
-            updated_dt = datetime.fromisoformat(updated.replace("Z", "+00:00"))
-            lines.append(f"   Updated: {updated_dt.strftime('%Y-%m-%d %H:%M')}")
-        except:
-            lines.append(f"   Updated: {updated}")
+    Args:
+        task_lists: List of task list dictionaries
 
-        lines.append("")  # Blank line between lists
+    Returns:
+        Formatted string output
+    """
+    if not task_lists:
+        return "No task lists found."
 
-    lines.append(f"{'='*70}\n")
-    return "\n".join(lines)
+    return "\n".join(_task_lists_lines(task_lists))
@@ -2,8 +2,90 @@
 Utility functions for gcmd.
 """
 
+import json
 import re
-from typing import Optional
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """
+    Parse a JSON document, using orjson when it is installed.
+
+    Args:
+        data: JSON document as bytes or str
+
+    Returns:
+        The decoded Python object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize an object to JSON, using orjson when it is installed.
+
+    Args:
+        obj: The object to serialize
+        indent: If True, pretty-print with 2-space indentation
+
+    Returns:
+        The encoded JSON document as UTF-8 bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+
+# Google Drive URL patterns, compiled once at import time
+_URL_PATTERNS = [
+    re.compile(pattern)
+    for pattern in (
+        # https://docs.google.com/document/d/FILE_ID/edit
+        r'docs\.google\.com/(?:document|spreadsheets|presentation)/d/([a-zA-Z0-9-_]+)',
+        # https://drive.google.com/file/d/FILE_ID/view
+        r'drive\.google\.com/file/d/([a-zA-Z0-9-_]+)',
+        # https://drive.google.com/open?id=FILE_ID
+        r'drive\.google\.com/open\?id=([a-zA-Z0-9-_]+)',
+        # https://drive.google.com/drive/folders/FILE_ID (for folders)
+        r'drive\.google\.com/drive/folders/([a-zA-Z0-9-_]+)',
+    )
+]
+
+# Prefixes of the common URL forms, whose file ID immediately follows
+_URL_PREFIXES = (
+    'https://docs.google.com/document/d/',
+    'https://docs.google.com/spreadsheets/d/',
+    'https://docs.google.com/presentation/d/',
+    'https://drive.google.com/file/d/',
+    'https://drive.google.com/open?id=',
+    'https://drive.google.com/drive/folders/',
+)
+
+_FILE_ID_RE = re.compile(r'[a-zA-Z0-9-_]+')
+
+# Replaces each character that isn't safe in file names on common
+# filesystems with an underscore
+_UNSAFE_FILENAME_TABLE = str.maketrans({char: '_' for char in '<>:"/\\|?*'})
+
+
+def sanitize_filename(name: str) -> str:
+    """
+    Replace characters that are unsafe in file names with underscores.
+
+    Args:
+        name: Proposed file name (e.g. a document or sheet title)
+
+    Returns:
+        str: The sanitized file name
+    """
+    return name.translate(_UNSAFE_FILENAME_TABLE)
 
 
 def extract_file_id(file_id_or_url: str) -> str:
@@ -31,20 +113,17 @@ def extract_file_id(file_id_or_url: str) -> str:
     if not any(char in file_id_or_url for char in ['/', ':', '?', '#']):
         return file_id_or_url.strip()
     
-    # Try different URL patterns
-    patterns = [
-        # https://docs.google.com/document/d/FILE_ID/edit
-        r'docs\.google\.com/(?:document|spreadsheets|presentation)/d/([a-zA-Z0-9-_]+)',
-        # https://drive.google.com/file/d/FILE_ID/view
-        r'drive\.google\.com/file/d/([a-zA-Z0-9-_]+)',
-        # https://drive.google.com/open?id=FILE_ID
-        r'drive\.google\.com/open\?id=([a-zA-Z0-9-_]+)',
-        # https://drive.google.com/drive/folders/FILE_ID (for folders)
-        r'drive\.google\.com/drive/folders/([a-zA-Z0-9-_]+)',
-    ]
+    # Common URL forms: match the ID right after a known prefix
+    for prefix in _URL_PREFIXES:
+        if file_id_or_url.startswith(prefix):
+            match = _FILE_ID_RE.match(file_id_or_url, len(prefix))
+            if match:
+                return match.group(0)
+            break
     
-    for pattern in patterns:
-        match = re.search(pattern, file_id_or_url)
+    # Fall back to searching anywhere in the string
+    for pattern in _URL_PATTERNS:
+        match = pattern.search(file_id_or_url)
         if match:
             return match.group(1)
     
@@ -60,6 +139,10 @@ def extract_file_id(file_id_or_url: str) -> str:
     )
 
 
+# (unit, format spec) for each power of 1024
+_SIZE_UNITS = (("B", "d"), ("KB", ".1f"), ("MB", ".2f"), ("GB", ".2f"))
+
+
 def format_file_size(size_bytes: Optional[int]) -> str:
     """
     Format file size in human-readable format.
@@ -77,10 +160,9 @@ def format_file_size(size_bytes: Optional[int]) -> str:
     
     if size < 1024:
         return f"{size} B"
-    elif size < 1024 * 1024:
-        return f"{size / 1024:.1f} KB"
-    elif size < 1024 * 1024 * 1024:
-        return f"{size / (1024 * 1024):.2f} MB"
-    else:
-        return f"{size / (1024 * 1024 * 1024):.2f} GB"
+    
+    # Each unit is 2**10 times the previous one, so the bit length picks it
+    unit = min((size.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    name, fmt = _SIZE_UNITS[unit]
+    return f"{size / (1 << (unit * 10)):{fmt}} {name}"
 